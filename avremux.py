@@ -0,0 +1,135 @@
+"""
+Remux streams into MP4 in-process with PyAV (libav bindings)
+
+Used when every mapped stream is copied as-is: packets go straight from the
+demuxer to the MP4 muxer, without starting an FFmpeg process. PyAV is an
+optional dependency, AVAILABLE is False when it is not installed.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Optional
+
+try:
+    import av
+except ImportError:
+    av = None
+
+AVAILABLE = av is not None
+
+
+def _add_stream_from_template(output, template):
+    """
+    Add an output stream with the codec parameters of an input stream
+
+    Args:
+        output: Output container
+        template: Input stream to copy codec parameters from
+
+    Returns:
+        New output stream
+    """
+    # PyAV 13 replaced add_stream(template=...) with add_stream_from_template()
+    if hasattr(output, 'add_stream_from_template'):
+        return output.add_stream_from_template(template)
+    return output.add_stream(template=template)
+
+
+def remux(
+    input_path: str,
+    output_path: str,
+    audio_order: List[int],
+    audio_tags: List[dict],
+    duration: Optional[float],
+    logger: logging.Logger
+) -> bool:
+    """
+    Copy the first video stream and the audio streams into an MP4 file
+
+    The file is muxed into a temporary file next to output_path and moved
+    into place once complete, so a failure never touches an existing file.
+
+    Args:
+        input_path: Path to input video file
+        output_path: Path to output file
+        audio_order: Input audio stream indices in output order
+        audio_tags: Tags of the source audio streams (language, title)
+        duration: Total video duration in seconds (for progress reporting)
+        logger: Logger instance
+
+    Returns:
+        True if the output was written, False if PyAV is missing or failed
+    """
+    if not AVAILABLE:
+        return False
+
+    tmp_path = None
+
+    try:
+        if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            logger.warning("Output file is the input file, cannot remux in place")
+            return False
+
+        with av.open(input_path) as src:
+            if not src.streams.video:
+                logger.debug("No video stream found, cannot remux in-process")
+                return False
+
+            input_streams = [src.streams.video[0]] + [src.streams.audio[idx] for idx in audio_order]
+
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{os.path.basename(output_path)}.",
+                suffix='.tmp',
+                dir=os.path.dirname(os.path.abspath(output_path))
+            )
+            os.close(fd)
+
+            with av.open(tmp_path, mode='w', format='mp4', options={'movflags': 'faststart'}) as dst:
+                dst.metadata.update(src.metadata)
+
+                stream_map = {}
+                for output_idx, stream in enumerate(input_streams):
+                    out_stream = _add_stream_from_template(dst, stream)
+                    out_stream.time_base = stream.time_base
+                    stream_map[stream.index] = out_stream
+
+                    # Audio tracks keep their language and title tags
+                    if output_idx > 0:
+                        tags = audio_tags[audio_order[output_idx - 1]]
+                        for key in ('language', 'title'):
+                            if tags.get(key):
+                                out_stream.metadata[key] = tags[key]
+
+                last_progress_time = 0
+                for packet in src.demux(*input_streams):
+                    # Demuxer flush packets carry no data
+                    if packet.dts is None:
+                        continue
+
+                    packet.stream = stream_map[packet.stream.index]
+                    dst.mux(packet)
+
+                    current_time = time.time()
+                    if duration and packet.pts is not None and current_time - last_progress_time >= 2:
+                        percentage = min(100.0, float(packet.pts * packet.time_base) / duration * 100)
+                        logger.info(f"Progress: {percentage:.1f}%")
+                        last_progress_time = current_time
+
+        # mkstemp creates the file owner-only, give it the input's permissions
+        shutil.copymode(input_path, tmp_path)
+        os.replace(tmp_path, output_path)
+        tmp_path = None
+
+    except Exception as e:
+        logger.warning(f"In-process remux failed: {e}")
+        return False
+
+    finally:
+        # Also reached on Ctrl+C, which would leave a full-size hidden file behind
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return True
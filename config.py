@@ -10,7 +10,7 @@ OUTPUT_DIR = "output"
 LOGS_DIR = "logs"
 
 # Supported input formats
-SUPPORTED_FORMATS = ['.mkv', '.avi']
+SUPPORTED_FORMATS = ['.mkv', '.avi', '.mp4', '.m4v', '.mov']
 
 # FFmpeg video settings
 VIDEO_CODEC = 'libx264'
@@ -18,11 +18,28 @@ VIDEO_PRESET = 'medium'  # Options: ultrafast, superfast, veryfast, faster, fast
 VIDEO_CRF = 23  # Constant Rate Factor: 18-28 (lower = better quality, larger file)
 PIXEL_FORMAT = 'yuv420p'  # Required for QuickTime compatibility
 
+# libx264 tuning
+# 'zerolatency' disables lookahead and B-frame buffering: roughly a third of
+# the frame-buffer memory at some quality cost, useful when many parallel
+# batch jobs share one machine. 'fastdecode' eases playback on weak devices.
+X264_TUNE = None  # Options: None, film, animation, grain, fastdecode, zerolatency
+X264_THREADS = 0  # Encoder threads (0 = FFMPEG_THREADS in parallel batch mode, otherwise auto)
+X264_PARAMS = 'aq-mode=3:rc-lookahead=20'  # Passed to -x264-params (None to disable)
+
 # FFmpeg audio settings
 AUDIO_CODEC = 'aac'
 AUDIO_BITRATE = '192k'
 AUDIO_CHANNELS = 2  # Stereo
 
+# Stream copy
+# Copy H.264 (yuv420p) video and AAC (stereo or mono) audio as-is instead of
+# re-encoding them. Only the container changes, so conversion is I/O bound.
+ALLOW_STREAM_COPY = True
+
+# Copy-only conversions without subtitles are remuxed in-process when PyAV
+# (pip install av) is installed, instead of starting an FFmpeg process
+USE_IN_PROCESS_REMUX = True
+
 # FFmpeg output settings
 MOVFLAGS = '+faststart'  # Enable fast start for streaming/web compatibility
 
@@ -36,10 +53,70 @@ QUALITY_PRESETS = {
     'compressed': {'crf': 28, 'preset': 'fast'}
 }
 
-# GPU acceleration (macOS)
+# GPU acceleration
 # Set to True to use hardware encoding (faster but may reduce quality slightly)
 USE_GPU_ACCELERATION = False
-GPU_ENCODER = 'h264_videotoolbox'  # macOS hardware encoder
+GPU_PROFILE = None  # None = auto-detect, or a key of HW_ENCODER_PROFILES
+
+# Hardware encoder profiles
+# hwaccel/hwaccel_output_format are input options (placed before -i) so frames
+# are decoded on the device and stay there until the encoder picks them up.
+# 'decoders' maps the source codec to a dedicated hardware decoder, 'quality'
+# is the rate-control flag that receives the CRF value, and 'video_filter'
+# replaces -pix_fmt when frames never leave GPU memory. Frames stay on the
+# device only with a dedicated decoder and a HW_DECODE_PIX_FMTS source;
+# anything else (e.g. 10-bit H.264) is decoded to system memory and handed
+# to the encoder as 'pix_fmt'. A failed hardware encode is retried with
+# VIDEO_CODEC.
+HW_ENCODER_PROFILES = {
+    'nvenc': {
+        'hwaccel': 'cuda',
+        'hwaccel_output_format': 'cuda',
+        'decoders': {'h264': 'h264_cuvid', 'hevc': 'hevc_cuvid'},
+        'encoder': 'h264_nvenc',
+        'preset': 'p4',  # p1 (fastest) to p7 (best quality)
+        'rate_control': ['-rc', 'vbr', '-b:v', '0'],
+        'quality': '-cq',
+        'video_filter': 'scale_cuda=format=yuv420p',
+        'pix_fmt': 'yuv420p',
+    },
+    'videotoolbox': {
+        'hwaccel': 'videotoolbox',
+        'hwaccel_output_format': None,
+        'decoders': {},
+        'encoder': 'h264_videotoolbox',
+        'preset': None,
+        'rate_control': [],
+        'quality': None,
+        'video_filter': None,
+        'pix_fmt': PIXEL_FORMAT,
+    },
+    'qsv': {
+        'hwaccel': 'qsv',
+        'hwaccel_output_format': 'qsv',
+        'decoders': {'h264': 'h264_qsv', 'hevc': 'hevc_qsv'},
+        'encoder': 'h264_qsv',
+        'preset': 'medium',
+        'rate_control': [],
+        'quality': '-global_quality',
+        'video_filter': 'vpp_qsv=format=nv12',
+        'pix_fmt': 'nv12',
+    },
+}
+
+# Source pixel formats the dedicated hardware decoders handle (8-bit 4:2:0)
+HW_DECODE_PIX_FMTS = ['yuv420p', 'yuvj420p', 'nv12']
+
+# Auto-detection order per platform (sys.platform prefix)
+HW_PROFILE_PRIORITY = {
+    'darwin': ['videotoolbox'],
+    'linux': ['nvenc', 'qsv'],
+    'win32': ['nvenc', 'qsv'],
+}
+
+# Parallel batch conversion
+BATCH_JOBS = None  # Files converted at once in batch mode (None = CPU cores / FFMPEG_THREADS, 1 = serial)
+FFMPEG_THREADS = 4  # Threads per FFmpeg process in parallel batch mode (FFmpeg saturates around 16)
 
 # Subtitle settings
 INCLUDE_SUBTITLES = True
@@ -48,5 +125,12 @@ SUBTITLE_CODEC = 'mov_text'  # QuickTime compatible subtitle format
 # File naming
 OUTPUT_SUFFIX = '_converted'
 
+# Probe cache (ffprobe results for unchanged files are reused across runs)
+USE_PROBE_CACHE = True
+PROBE_CACHE_FILE = os.path.join(LOGS_DIR, '.probe_cache.json')
+
+# FFmpeg version and encoder list, refreshed when the binary changes
+FFMPEG_CACHE_FILE = os.path.join(LOGS_DIR, '.ffmpeg_cache.json')
+
 # Logging
 LOG_LEVEL = 'INFO'  # Options: DEBUG, INFO, WARNING, ERROR
@@ -5,22 +5,49 @@ with French audio as default
 """
 
 import argparse
+import itertools
+import logging
+import logging.handlers
+import multiprocessing
 import subprocess
 import sys
 import os
-from pathlib import Path
-from typing import Optional, List
 import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional, List, Tuple
 import time
 
 import config
+import faststart
 import utils
 
+# Read FFmpeg output in large chunks to cut read() syscalls
+PIPE_BUFFER_SIZE = 1 << 20
+
+# FFmpeg log lines reported as warnings (case-insensitive, no lowercased copy per line)
+_FFMPEG_ERROR_RE = re.compile(rb'error|invalid', re.IGNORECASE)
+
+# Path placeholders in command templates (matched as whole arguments)
+INPUT_PLACEHOLDER = '{INPUT}'
+OUTPUT_PLACEHOLDER = '{OUTPUT}'
+
+# Python 3.10+ can also grow the kernel pipe buffer to match (Linux only)
+_PIPESIZE_KWARGS = {'pipesize': PIPE_BUFFER_SIZE} if sys.version_info >= (3, 10) else {}
+
 
 class VideoConverter:
     """Main video converter class"""
 
-    def __init__(self, logger, crf: Optional[int] = None, preset: Optional[str] = None):
+    def __init__(
+        self,
+        logger,
+        crf: Optional[int] = None,
+        preset: Optional[str] = None,
+        threads: int = 0,
+        shards: int = 1
+    ):
         """
         Initialize video converter
 
@@ -28,174 +55,330 @@ class VideoConverter:
             logger: Logger instance
             crf: Optional custom CRF value
             preset: Optional custom preset
+            threads: FFmpeg threads per conversion (0 = let FFmpeg decide)
+            shards: Number of segments encoded in parallel per file (1 = no sharding)
         """
         self.logger = logger
         self.crf = crf if crf is not None else config.VIDEO_CRF
         self.preset = preset if preset is not None else config.VIDEO_PRESET
+        self.threads = threads
+        self.shards = max(1, shards)
+
+        # Resolve hardware encoder once per converter
+        self.hw_profile = None
+        if config.USE_GPU_ACCELERATION:
+            profile_name = utils.select_hw_profile(logger)
+            if profile_name:
+                self.hw_profile = config.HW_ENCODER_PROFILES[profile_name]
+                self.logger.info(f"Using GPU acceleration: {profile_name} ({self.hw_profile['encoder']})")
+            else:
+                self.logger.warning(f"No hardware encoder available, falling back to {config.VIDEO_CODEC}")
+
+        self._build_static_args()
+
+        # FFmpeg command templates keyed by utils.get_stream_signature()
+        self._command_templates = {}
+
+    def _build_static_args(self):
+        """
+        Precompute the FFmpeg arguments that are identical for every file
+
+        build_ffmpeg_command() only adds the input/output paths and the
+        per-file stream mapping around these.
+        """
+        threads = self.threads
+
+        # Software encode, also the retry when a hardware encode fails
+        software_args = ['-c:v', config.VIDEO_CODEC, '-preset', self.preset, '-crf', str(self.crf)]
+        if config.X264_TUNE:
+            software_args.extend(['-tune', config.X264_TUNE])
+        if config.X264_PARAMS:
+            software_args.extend(['-x264-params', config.X264_PARAMS])
+
+        # Pixel format for QuickTime compatibility
+        software_args.extend(['-pix_fmt', config.PIXEL_FORMAT])
+
+        # Limit threads so parallel batch jobs share the cores evenly
+        software_threads = config.X264_THREADS or threads
+        self._software_encode_args = software_args + (['-threads', str(software_threads)] if software_threads else [])
+
+        thread_args = ['-threads', str(threads)] if threads else []
+        self._video_copy_args = ['-c:v', 'copy'] + thread_args
+
+        # Hardware decode options must precede the input they apply to
+        self._hwaccel_args = []
+        self._device_input_args = None
+        self._device_encode_args = None
+
+        if self.hw_profile:
+            profile = self.hw_profile
+
+            if profile['hwaccel']:
+                self._hwaccel_args = ['-hwaccel', profile['hwaccel']]
+
+            encoder_args = ['-c:v', profile['encoder']]
+            if profile['preset']:
+                encoder_args.extend(['-preset', profile['preset']])
+            encoder_args.extend(profile['rate_control'])
+            if profile['quality']:
+                encoder_args.extend([profile['quality'], str(self.crf)])
+
+            # Frames decoded to system memory (software decode, or -hwaccel falling back to it)
+            self._video_encode_args = encoder_args + ['-pix_fmt', profile['pix_fmt']] + thread_args
+
+            # Frames kept in GPU memory by a dedicated decoder, so convert the pixel format there
+            if profile['hwaccel_output_format'] and profile['video_filter']:
+                self._device_input_args = self._hwaccel_args + [
+                    '-hwaccel_output_format', profile['hwaccel_output_format']
+                ]
+                self._device_encode_args = encoder_args + ['-vf', profile['video_filter']] + thread_args
+        else:
+            self._video_encode_args = self._software_encode_args
+
+        # Audio encoding settings
+        self._audio_encode_args = [
+            '-c:a', config.AUDIO_CODEC,
+            '-b:a', config.AUDIO_BITRATE,
+            '-ac', str(config.AUDIO_CHANNELS)
+        ]
+
+        self._static_tail = [
+            # MP4 optimization flags
+            '-movflags', config.MOVFLAGS,
+            # Machine-readable progress on stdout, only warnings and errors in the log
+            '-progress', 'pipe:1', '-nostats', '-loglevel', 'warning',
+            # Overwrite output file without asking
+            '-y'
+        ]
 
     def build_ffmpeg_command(
         self,
         input_path: str,
         output_path: str,
-        probe_data: dict
+        probe_data: dict,
+        streams: utils.StreamsInfo
     ) -> List[str]:
         """
         Build FFmpeg command with proper flags
 
+        Files with the same stream layout (e.g. episodes of a series) share
+        one command template; only the input and output paths differ.
+
         Args:
             input_path: Path to input file
             output_path: Path to output file
             probe_data: FFprobe data
+            streams: Streams from utils.get_streams_info()
 
         Returns:
             FFmpeg command as list of arguments
         """
-        video_streams, audio_streams, subtitle_streams = utils.get_streams_info(probe_data, self.logger)
+        signature = utils.get_stream_signature(probe_data)
+        template = self._command_templates.get(signature)
+
+        if template is None:
+            template = self.build_command_template(streams)
+            self._command_templates[signature] = template
+        else:
+            self.logger.debug("Reusing FFmpeg command template for identical stream layout")
+
+        return _fill_template(template, input_path, output_path)
+
+    def build_command_template(self, streams: utils.StreamsInfo, software: bool = False) -> List[str]:
+        """
+        Build FFmpeg command for a stream layout, with placeholder paths
+
+        Args:
+            streams: Streams of a file with this stream layout
+            software: Encode with config.VIDEO_CODEC even if a hardware encoder is selected
 
-        # Start building command
-        cmd = ['ffmpeg', '-i', input_path]
+        Returns:
+            FFmpeg command as list of arguments, with INPUT_PLACEHOLDER and
+            OUTPUT_PLACEHOLDER in place of the input and output paths
+        """
+        video_streams = streams.video
 
         # Video encoding settings
-        if config.USE_GPU_ACCELERATION:
-            self.logger.info(f"Using GPU acceleration: {config.GPU_ENCODER}")
-            cmd.extend(['-c:v', config.GPU_ENCODER])
+        if self._copies_video(streams):
+            self.logger.info("Video stream is already H.264, copying without re-encoding")
+            input_args = []
+            video_args = self._video_copy_args
+        elif self.hw_profile and not software:
+            source = video_streams[0] if video_streams else {}
+            decoder = self.hw_profile['decoders'].get(source.get('codec_name'))
+
+            # Dedicated decoders only handle 8-bit 4:2:0, other sources are
+            # decoded to system memory where -pix_fmt converts them
+            if decoder and self._device_input_args is not None and source.get('pix_fmt') in config.HW_DECODE_PIX_FMTS:
+                input_args = self._device_input_args + ['-c:v', decoder]
+                video_args = self._device_encode_args
+            else:
+                input_args = self._hwaccel_args
+                video_args = self._video_encode_args
         else:
-            cmd.extend(['-c:v', config.VIDEO_CODEC])
-            cmd.extend(['-preset', self.preset])
-            cmd.extend(['-crf', str(self.crf)])
+            input_args = []
+            video_args = self._software_encode_args
 
-        # Pixel format for QuickTime compatibility
-        cmd.extend(['-pix_fmt', config.PIXEL_FORMAT])
-
-        # Audio encoding settings
-        cmd.extend(['-c:a', config.AUDIO_CODEC])
-        cmd.extend(['-b:a', config.AUDIO_BITRATE])
-        cmd.extend(['-ac', str(config.AUDIO_CHANNELS)])
+        # Per-file stream mapping and metadata
+        stream_args = []
 
         # Map video stream (always use first video stream)
         if video_streams:
-            cmd.extend(['-map', '0:v:0'])
+            stream_args.extend(['-map', '0:v:0'])
         else:
             self.logger.warning("No video stream found!")
 
+        stream_args.extend(self._build_track_args(streams))
+
+        # Copy metadata
+        stream_args.extend(['-map_metadata', '0'])
+
+        return (
+            ['ffmpeg'] + input_args + ['-i', INPUT_PLACEHOLDER]
+            + video_args + self._audio_encode_args
+            + stream_args + self._static_tail
+            + [OUTPUT_PLACEHOLDER]
+        )
+
+    def _copies_video(self, streams: utils.StreamsInfo) -> bool:
+        """
+        Check if the video stream is copied instead of re-encoded
+
+        Args:
+            streams: Streams from utils.get_streams_info()
+
+        Returns:
+            True if the first video stream is already QuickTime-compatible H.264
+        """
+        return (
+            config.ALLOW_STREAM_COPY
+            and bool(streams.video)
+            and utils.is_copyable_video(streams.video[0])
+        )
+
+    def _build_track_args(self, streams: utils.StreamsInfo, input_index: int = 0) -> List[str]:
+        """
+        Build the audio and subtitle mapping and metadata arguments
+
+        Args:
+            streams: Streams of the source file
+            input_index: FFmpeg input index of the source file
+
+        Returns:
+            List of FFmpeg arguments
+        """
+        audio_streams = streams.audio
+        subtitle_streams = streams.subtitle
+        track_args = []
+
         # Map audio streams with French first
         if audio_streams:
-            audio_mapping = utils.get_audio_mapping(audio_streams, self.logger)
-
-            for output_idx, input_idx in enumerate(audio_mapping):
-                cmd.extend(['-map', f'0:a:{input_idx}'])
+            audio_mapping = utils.get_audio_mapping(streams, self.logger)
 
             # Set French audio as default (first audio track after mapping)
-            cmd.extend(['-disposition:a:0', 'default'])
+            track_args.extend(['-disposition:a:0', 'default'])
 
-            # Preserve language metadata for all audio tracks
+            # Map each track and preserve its language metadata in one pass
             for output_idx, input_idx in enumerate(audio_mapping):
                 original_stream = audio_streams[input_idx]
+                track_args.extend(['-map', f'{input_index}:a:{input_idx}'])
+
+                # Overrides the -c:a encoder above for this track only
+                if config.ALLOW_STREAM_COPY and utils.is_copyable_audio(original_stream):
+                    track_args.extend([f'-c:a:{output_idx}', 'copy'])
+                    self.logger.debug(f"Audio track {output_idx}: copying without re-encoding")
+
                 tags = original_stream.get('tags', {})
                 language = tags.get('language', '')
                 title = tags.get('title', '')
+                metadata_opt = f'-metadata:s:a:{output_idx}'
 
                 # Set language metadata if available
                 if language:
-                    cmd.extend([f'-metadata:s:a:{output_idx}', f'language={language}'])
+                    track_args.extend([metadata_opt, f'language={language}'])
                     self.logger.debug(f"Audio track {output_idx}: language={language}")
 
                 # Set title metadata if available
                 if title:
-                    cmd.extend([f'-metadata:s:a:{output_idx}', f'title={title}'])
+                    track_args.extend([metadata_opt, f'title={title}'])
                     self.logger.debug(f"Audio track {output_idx}: title={title}")
 
         # Map subtitles if enabled
         if config.INCLUDE_SUBTITLES and subtitle_streams:
-            french_sub_idx = utils.find_french_subtitle_stream(subtitle_streams, self.logger)
+            french_sub_idx = streams.french_subtitle_idx
 
             # Build subtitle mapping (French first if available)
-            subtitle_mapping = []
+            subtitle_count = len(subtitle_streams)
             if french_sub_idx is not None:
-                subtitle_mapping.append(french_sub_idx)
-                for idx in range(len(subtitle_streams)):
-                    if idx != french_sub_idx:
-                        subtitle_mapping.append(idx)
+                subtitle_mapping = list(itertools.chain(
+                    [french_sub_idx],
+                    range(french_sub_idx),
+                    range(french_sub_idx + 1, subtitle_count)
+                ))
             else:
-                subtitle_mapping = list(range(len(subtitle_streams)))
+                subtitle_mapping = list(range(subtitle_count))
+
+            # Same codec for every subtitle track, first one is the default
+            track_args.extend(['-c:s', config.SUBTITLE_CODEC, '-disposition:s:0', 'default'])
 
             # Map all subtitle streams
             for output_idx, input_idx in enumerate(subtitle_mapping):
-                cmd.extend(['-map', f'0:s:{input_idx}'])
-                cmd.extend(['-c:s', config.SUBTITLE_CODEC])
-
-                # Set first subtitle as default
-                if output_idx == 0:
-                    cmd.extend(['-disposition:s:0', 'default'])
+                track_args.extend(['-map', f'{input_index}:s:{input_idx}'])
 
                 # Preserve language metadata for all subtitle tracks
                 original_stream = subtitle_streams[input_idx]
                 tags = original_stream.get('tags', {})
                 language = tags.get('language', '')
                 title = tags.get('title', '')
+                metadata_opt = f'-metadata:s:s:{output_idx}'
 
                 # Set language metadata if available
                 if language:
-                    cmd.extend([f'-metadata:s:s:{output_idx}', f'language={language}'])
+                    track_args.extend([metadata_opt, f'language={language}'])
                     self.logger.debug(f"Subtitle track {output_idx}: language={language}")
 
                 # Set title metadata if available
                 if title:
-                    cmd.extend([f'-metadata:s:s:{output_idx}', f'title={title}'])
+                    track_args.extend([metadata_opt, f'title={title}'])
                     self.logger.debug(f"Subtitle track {output_idx}: title={title}")
 
-        # MP4 optimization flags
-        cmd.extend(['-movflags', config.MOVFLAGS])
-
-        # Copy metadata
-        cmd.extend(['-map_metadata', '0'])
+        return track_args
 
-        # Overwrite output file without asking
-        cmd.extend(['-y'])
-
-        # Output file
-        cmd.append(output_path)
-
-        return cmd
-
-    def parse_progress(self, line: str, duration: Optional[float]) -> Optional[dict]:
+    def parse_progress(self, progress: dict, duration: Optional[float]) -> Optional[dict]:
         """
-        Parse FFmpeg progress output
+        Parse an FFmpeg progress record
 
         Args:
-            line: FFmpeg output line
+            progress: key=value byte pairs of one `-progress` block (up to `progress=`)
             duration: Total video duration in seconds
 
         Returns:
             Dictionary with progress info, or None
         """
-        # FFmpeg outputs progress like: frame=  123 fps= 45 time=00:00:05.12 ...
-        time_match = re.search(r'time=(\d+):(\d+):(\d+\.\d+)', line)
-        fps_match = re.search(r'fps=\s*(\d+\.?\d*)', line)
-        frame_match = re.search(r'frame=\s*(\d+)', line)
-
-        if time_match:
-            hours, minutes, seconds = time_match.groups()
-            current_time = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
-
-            progress_info = {
-                'current_time': current_time,
-                'fps': float(fps_match.group(1)) if fps_match else 0,
-                'frame': int(frame_match.group(1)) if frame_match else 0
-            }
-
-            if duration and duration > 0:
-                progress_info['percentage'] = min(100, (current_time / duration) * 100)
-                if progress_info['fps'] > 0:
-                    remaining_time = (duration - current_time) / progress_info['fps']
-                    progress_info['eta'] = remaining_time
-            else:
-                progress_info['percentage'] = 0
-                progress_info['eta'] = None
-
-            return progress_info
+        # out_time_ms is in microseconds as well, kept by older FFmpeg versions
+        out_time_us = _parse_number(progress.get(b'out_time_us', progress.get(b'out_time_ms')), int)
+        if out_time_us is None:
+            return None
+
+        current_time = max(0, out_time_us) / 1_000_000
+        speed = _parse_number(progress.get(b'speed', b'').rstrip(b'x'), float)
+
+        progress_info = {
+            'current_time': current_time,
+            'fps': _parse_number(progress.get(b'fps'), float) or 0,
+            'frame': _parse_number(progress.get(b'frame'), int) or 0
+        }
+
+        if duration and duration > 0:
+            progress_info['percentage'] = min(100, (current_time / duration) * 100)
+            if speed:
+                # speed is the ratio of encoded media time to wall-clock time
+                progress_info['eta'] = max(0, duration - current_time) / speed
+        else:
+            progress_info['percentage'] = 0
+            progress_info['eta'] = None
 
-        return None
+        return progress_info
 
     def convert_video(self, input_path: str, output_path: Optional[str] = None) -> bool:
         """
@@ -220,6 +403,11 @@ class VideoConverter:
 
         self.logger.info(f"Output file: {output_path}")
 
+        # Writing over the input would destroy it while it is being read
+        if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            self.logger.error(f"Output file is the input file: {output_path}")
+            return False
+
         # Probe input file
         try:
             probe_data = utils.probe_file(input_path, self.logger)
@@ -227,6 +415,9 @@ class VideoConverter:
             self.logger.error(f"Failed to probe file: {e}")
             return False
 
+        # Grouped once, every conversion path below reads these
+        streams = utils.get_streams_info(probe_data, self.logger)
+
         # Get video duration for progress tracking
         duration = utils.get_video_duration(probe_data)
         if duration:
@@ -236,58 +427,36 @@ class VideoConverter:
         input_size = utils.get_file_size(input_path)
         self.logger.info(f"Input file size: {utils.format_file_size(input_size)}")
 
-        # Build FFmpeg command
-        cmd = self.build_ffmpeg_command(input_path, output_path, probe_data)
-
-        # Log the command (sanitized)
-        cmd_str = ' '.join(cmd)
-        self.logger.debug(f"FFmpeg command: {cmd_str}")
-
-        # Run FFmpeg
-        self.logger.info("Starting FFmpeg conversion...")
         start_time = time.time()
 
-        try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-
-            last_progress_time = 0
-            for line in process.stdout:
-                # Parse progress
-                progress = self.parse_progress(line, duration)
-
-                if progress:
-                    current_time = time.time()
-                    # Update progress every 2 seconds
-                    if current_time - last_progress_time >= 2:
-                        percentage = progress.get('percentage', 0)
-                        fps = progress.get('fps', 0)
-                        eta = progress.get('eta')
-
-                        progress_msg = f"Progress: {percentage:.1f}% | FPS: {fps:.1f}"
-                        if eta is not None:
-                            progress_msg += f" | ETA: {utils.format_duration(eta)}"
-
-                        self.logger.info(progress_msg)
-                        last_progress_time = current_time
-
-                # Log FFmpeg errors
-                if 'error' in line.lower() or 'invalid' in line.lower():
-                    self.logger.warning(f"FFmpeg: {line.strip()}")
-
-            process.wait()
-
-            if process.returncode != 0:
-                self.logger.error(f"FFmpeg failed with return code {process.returncode}")
+        # Already QuickTime-compatible MP4 only needs its moov atom moved
+        if self._needs_faststart_only(probe_data, streams) and faststart.relocate_moov(input_path, output_path, self.logger):
+            self.logger.info("Input is already a compatible MP4, relocated moov atom without FFmpeg")
+        elif self._can_remux_in_process(streams) and self._remux_in_process(input_path, output_path, streams, duration):
+            self.logger.info("All streams copied in-process with PyAV, FFmpeg was not started")
+        elif self.shards > 1 and self._can_shard(streams, duration):
+            if not self.convert_video_sharded(input_path, output_path, probe_data, streams, self.shards):
                 return False
-
-        except Exception as e:
-            self.logger.error(f"Conversion failed: {e}")
-            return False
+        else:
+            # Build FFmpeg command
+            cmd = self.build_ffmpeg_command(input_path, output_path, probe_data, streams)
+
+            # Log the command (sanitized)
+            cmd_str = ' '.join(cmd)
+            self.logger.debug(f"FFmpeg command: {cmd_str}")
+
+            # Run FFmpeg
+            self.logger.info("Starting FFmpeg conversion...")
+            if not self._run_ffmpeg(cmd, duration):
+                if not self.hw_profile or self._copies_video(streams):
+                    return False
+
+                # Unsupported source or driver problem: retry on the CPU
+                self.logger.warning(f"Hardware encode failed, retrying with {config.VIDEO_CODEC}")
+                cmd = _fill_template(self.build_command_template(streams, software=True), input_path, output_path)
+                self.logger.debug(f"FFmpeg command: {' '.join(cmd)}")
+                if not self._run_ffmpeg(cmd, duration):
+                    return False
 
         # Calculate conversion time
         elapsed_time = time.time() - start_time
@@ -307,7 +476,7 @@ class VideoConverter:
         # Verify output file integrity
         self.logger.info("Verifying output file...")
         try:
-            output_probe = utils.probe_file(output_path, self.logger)
+            output_probe = utils.probe_file(output_path, self.logger, use_cache=False)
             output_duration = utils.get_video_duration(output_probe)
 
             if output_duration and duration:
@@ -325,11 +494,353 @@ class VideoConverter:
         self.logger.info(f"Successfully converted: {output_path}")
         return True
 
+    def _run_ffmpeg(self, cmd: List[str], duration: Optional[float]) -> bool:
+        """
+        Run FFmpeg and report its progress
+
+        Args:
+            cmd: FFmpeg command as list of arguments
+            duration: Total video duration in seconds
+
+        Returns:
+            True if FFmpeg succeeded, False otherwise
+        """
+        try:
+            # Own session: a Ctrl+C in the terminal reaches Python only, and
+            # the child is stopped below instead of being left running
+            with subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=PIPE_BUFFER_SIZE,
+                start_new_session=True,
+                **_PIPESIZE_KWARGS
+            ) as process:
+                try:
+                    last_progress_time = 0
+                    progress_block = {}
+                    # Output is read as bytes, only lines that get logged are decoded
+                    for line in process.stdout:
+                        key, sep, value = line.strip().partition(b'=')
+
+                        # Anything that is not a key=value progress record is an FFmpeg log message
+                        if not sep or b' ' in key:
+                            # Log FFmpeg errors
+                            if _FFMPEG_ERROR_RE.search(line):
+                                self.logger.warning(f"FFmpeg: {line.strip().decode('utf-8', 'replace')}")
+                            continue
+
+                        progress_block[key] = value
+                        if key != b'progress':
+                            continue
+
+                        # Parse progress once the block is complete
+                        progress = self.parse_progress(progress_block, duration)
+                        progress_block = {}
+
+                        if progress:
+                            current_time = time.time()
+                            # Update progress every 2 seconds
+                            if current_time - last_progress_time >= 2:
+                                percentage = progress.get('percentage', 0)
+                                fps = progress.get('fps', 0)
+                                eta = progress.get('eta')
+
+                                progress_msg = f"Progress: {percentage:.1f}% | FPS: {fps:.1f}"
+                                if eta is not None:
+                                    progress_msg += f" | ETA: {utils.format_duration(eta)}"
+
+                                self.logger.info(progress_msg)
+                                last_progress_time = current_time
+
+                    process.wait()
+                except BaseException:
+                    self._stop_process(process)
+                    raise
+
+            if process.returncode != 0:
+                self.logger.error(f"FFmpeg failed with return code {process.returncode}")
+                return False
+
+        except KeyboardInterrupt:
+            self.logger.error("Conversion interrupted, FFmpeg stopped")
+            raise
+        except Exception as e:
+            self.logger.error(f"Conversion failed: {e}")
+            return False
+
+        return True
+
+    def _stop_process(self, process: subprocess.Popen) -> None:
+        """
+        Terminate an FFmpeg process, killing it if it does not exit in time
+
+        Args:
+            process: Running FFmpeg process
+        """
+        if process.poll() is not None:
+            return
+
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.logger.warning("FFmpeg did not exit after terminate, killing it")
+            process.kill()
+            process.wait()
+
+    def _can_remux_in_process(self, streams: utils.StreamsInfo) -> bool:
+        """
+        Check if the conversion only copies streams and PyAV can do it
+
+        Subtitles need converting to mov_text, so files that keep subtitle
+        tracks always go through FFmpeg.
+
+        Args:
+            streams: Streams from utils.get_streams_info()
+
+        Returns:
+            True if the file can be remuxed in-process, False otherwise
+        """
+        if not (config.USE_IN_PROCESS_REMUX and config.ALLOW_STREAM_COPY):
+            return False
+
+        # Imported on first use: loading PyAV pulls in the libav shared libraries
+        import avremux
+        if not avremux.AVAILABLE:
+            return False
+
+        if not streams.video or not utils.is_copyable_video(streams.video[0]):
+            return False
+
+        if not all(utils.is_copyable_audio(stream) for stream in streams.audio):
+            return False
+
+        return not (config.INCLUDE_SUBTITLES and streams.subtitle)
+
+    def _remux_in_process(
+        self,
+        input_path: str,
+        output_path: str,
+        streams: utils.StreamsInfo,
+        duration: Optional[float]
+    ) -> bool:
+        """
+        Remux with PyAV, keeping the French-first audio order
+
+        Args:
+            input_path: Path to input video file
+            output_path: Path to output file
+            streams: Streams from utils.get_streams_info()
+            duration: Total video duration in seconds
+
+        Returns:
+            True if the output was written, False to fall back to FFmpeg
+        """
+        import avremux
+
+        audio_order = utils.get_audio_mapping(streams, self.logger) if streams.audio else []
+        audio_tags = [stream.get('tags', {}) for stream in streams.audio]
+
+        self.logger.info("Remuxing in-process with PyAV...")
+        if avremux.remux(input_path, output_path, audio_order, audio_tags, duration, self.logger):
+            return True
+
+        self.logger.info("Falling back to FFmpeg")
+        return False
+
+    def _can_shard(self, streams: utils.StreamsInfo, duration: Optional[float]) -> bool:
+        """
+        Check if a file's video can be encoded in parallel segments
+
+        Only software re-encodes benefit: copied streams need no encoding and
+        a hardware encoder is already saturated by a single session.
+
+        Args:
+            streams: Streams from utils.get_streams_info()
+            duration: Video duration in seconds
+
+        Returns:
+            True if sharding applies, False otherwise
+        """
+        if self.hw_profile or not duration or not streams.video:
+            return False
+
+        return not self._copies_video(streams)
+
+    def convert_video_sharded(
+        self,
+        input_path: str,
+        output_path: str,
+        probe_data: dict,
+        streams: utils.StreamsInfo,
+        n_shards: int
+    ) -> bool:
+        """
+        Encode video in parallel segments, then mux them with the audio and subtitles
+
+        Segments are cut at keyframes and encoded video-only by concurrent
+        FFmpeg processes. A final pass joins them with the concat demuxer
+        (stream copy) and adds the audio and subtitle tracks from the source,
+        so audio is encoded once without gaps at segment boundaries.
+
+        Args:
+            input_path: Path to input video file
+            output_path: Path to output file
+            probe_data: FFprobe data
+            streams: Streams from utils.get_streams_info()
+            n_shards: Number of segments
+
+        Returns:
+            True if conversion successful, False otherwise
+        """
+        duration = utils.get_video_duration(probe_data)
+
+        # Keyframe timestamps are absolute, -ss counts from the container start
+        start_time = utils.get_start_time(probe_data)
+        keyframes = [t - start_time for t in utils.get_keyframe_times(input_path, self.logger)]
+
+        cut_points = _shard_cut_points(duration, keyframes, n_shards)
+        if len(cut_points) < 3:
+            self.logger.info("Not enough keyframes to split the video, converting in one pass")
+            cmd = self.build_ffmpeg_command(input_path, output_path, probe_data, streams)
+            return self._run_ffmpeg(cmd, duration)
+
+        segments = list(zip(cut_points[:-1], cut_points[1:]))
+        self.logger.info(f"Encoding video in {len(segments)} parallel segments")
+
+        shard_dir = None
+        try:
+            shard_dir = tempfile.mkdtemp(prefix='.shards-', dir=os.path.dirname(os.path.abspath(output_path)))
+            shard_names = [f'shard_{idx:03d}.mp4' for idx in range(len(segments))]
+
+            with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                futures = [
+                    executor.submit(
+                        self._encode_shard,
+                        input_path,
+                        os.path.join(shard_dir, shard_name),
+                        start,
+                        end if idx < len(segments) - 1 else None
+                    )
+                    for idx, ((start, end), shard_name) in enumerate(zip(segments, shard_names))
+                ]
+                results = [future.result() for future in futures]
+
+            if not all(results):
+                self.logger.error("One or more video segments failed to encode")
+                return False
+
+            # Paths in the concat list are relative to the list file
+            concat_list = os.path.join(shard_dir, 'segments.txt')
+            with open(concat_list, 'w', encoding='utf-8') as f:
+                for shard_name in shard_names:
+                    f.write(f"file '{shard_name}'\n")
+
+            cmd = (
+                ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', concat_list, '-i', input_path]
+                + self._video_copy_args + self._audio_encode_args
+                + ['-map', '0:v:0']
+                + self._build_track_args(streams, input_index=1)
+                + ['-map_metadata', '1']
+                + self._static_tail
+                + [output_path]
+            )
+            self.logger.debug(f"FFmpeg command: {' '.join(cmd)}")
+            self.logger.info("Joining segments with audio and subtitle tracks...")
+
+            return self._run_ffmpeg(cmd, duration)
+        except OSError as e:
+            self.logger.error(f"Sharded conversion failed: {e}")
+            return False
+        finally:
+            if shard_dir is not None:
+                shutil.rmtree(shard_dir, ignore_errors=True)
+
+    def _encode_shard(self, input_path: str, shard_path: str, start: float, end: Optional[float]) -> bool:
+        """
+        Encode one video-only segment of a sharded conversion
+
+        Args:
+            input_path: Path to input video file
+            shard_path: Path to segment output file
+            start: Segment start in seconds
+            end: Segment end in seconds (None = end of file)
+
+        Returns:
+            True if the segment was encoded, False otherwise
+        """
+        # -ss before -i seeks the input; with re-encoding the cut is frame-accurate
+        cmd = ['ffmpeg', '-ss', f'{start:.6f}', '-i', input_path]
+        if end is not None:
+            cmd.extend(['-t', f'{end - start:.6f}'])
+        cmd.extend(['-map', '0:v:0'])
+        cmd.extend(self._video_encode_args)
+        cmd.extend(['-an', '-sn', '-dn', '-loglevel', 'error', '-y', shard_path])
+
+        end_label = utils.format_duration(end) if end is not None else 'end'
+        self.logger.debug(f"Segment {utils.format_duration(start)}-{end_label}: {' '.join(cmd)}")
+
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', 'replace').strip()
+            self.logger.error(f"Segment {utils.format_duration(start)}-{end_label} failed: {stderr}")
+            return False
+
+        self.logger.info(f"Segment {utils.format_duration(start)}-{end_label} encoded")
+        return True
+
+    def _needs_faststart_only(self, probe_data: dict, streams: utils.StreamsInfo) -> bool:
+        """
+        Check if the input is an MP4 that FFmpeg would only remux
+
+        True when the container is already MP4/MOV, every stream would be
+        copied, and the French-first track order already matches the file.
+
+        Args:
+            probe_data: FFprobe data
+            streams: Streams from utils.get_streams_info()
+
+        Returns:
+            True if relocating the moov atom is enough, False otherwise
+        """
+        if not config.ALLOW_STREAM_COPY:
+            return False
+
+        format_names = probe_data.get('format', {}).get('format_name', '').split(',')
+        if 'mp4' not in format_names and 'mov' not in format_names:
+            return False
+
+        video_streams, audio_streams, subtitle_streams = streams.video, streams.audio, streams.subtitle
+
+        if len(video_streams) != 1 or not utils.is_copyable_video(video_streams[0]):
+            return False
+
+        if not all(utils.is_copyable_audio(stream) for stream in audio_streams):
+            return False
+
+        if audio_streams:
+            if utils.get_audio_mapping(streams, self.logger) != list(range(len(audio_streams))):
+                return False
+            if not audio_streams[0].get('disposition', {}).get('default', 1):
+                return False
+
+        if subtitle_streams:
+            if not config.INCLUDE_SUBTITLES:
+                return False
+            if any(stream.get('codec_name') != config.SUBTITLE_CODEC for stream in subtitle_streams):
+                return False
+            if streams.french_subtitle_idx not in (None, 0):
+                return False
+
+        return True
+
     def convert_batch(
         self,
         input_dir: str,
         output_dir: Optional[str] = None,
-        skip_existing: bool = True
+        skip_existing: bool = True,
+        jobs: Optional[int] = None
     ) -> dict:
         """
         Convert all supported files in directory
@@ -338,18 +849,23 @@ class VideoConverter:
             input_dir: Input directory path
             output_dir: Output directory path (uses config default if None)
             skip_existing: Skip files that are already converted
+            jobs: Number of parallel FFmpeg processes (uses config default if None)
 
         Returns:
             Dictionary with conversion statistics
         """
         self.logger.info(f"Starting batch conversion from: {input_dir}")
 
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-
         # Find all supported files
         files = utils.list_files_in_directory(input_dir)
 
+        # MP4 inputs are supported, so earlier outputs in the same directory
+        # would otherwise be converted again as x_converted_converted.mp4
+        own_outputs = [file_path for file_path in files if utils.is_converted_output(file_path)]
+        if own_outputs:
+            self.logger.info(f"Ignoring {len(own_outputs)} file(s) produced by this converter")
+            files = [file_path for file_path in files if not utils.is_converted_output(file_path)]
+
         if not files:
             self.logger.warning(f"No supported files found in {input_dir}")
             return {'total': 0, 'success': 0, 'failed': 0, 'skipped': 0}
@@ -358,33 +874,67 @@ class VideoConverter:
 
         stats = {'total': len(files), 'success': 0, 'failed': 0, 'skipped': 0}
 
+        jobs = self.get_batch_jobs(jobs)
+        pending = []
+        queued = set()
+
+        # Scan the output directory once instead of checking each file
+        converted = utils.list_converted_files(output_dir) if skip_existing else set()
+
         for idx, file_path in enumerate(files, 1):
-            self.logger.info(f"\n{'='*60}")
-            self.logger.info(f"Processing file {idx}/{len(files)}: {Path(file_path).name}")
-            self.logger.info(f"{'='*60}")
+            if jobs == 1:
+                self.logger.info(f"\n{'='*60}")
+                self.logger.info(f"Processing file {idx}/{len(files)}: {os.path.basename(file_path)}")
+                self.logger.info(f"{'='*60}")
+
+            # Generate output path
+            output_path = utils.generate_output_path(file_path, output_dir=output_dir)
+            output_name = os.path.basename(output_path)
 
             # Check if already converted
-            if skip_existing and utils.is_already_converted(file_path, output_dir):
+            if output_name in converted:
                 self.logger.info(f"Skipping (already converted): {file_path}")
                 stats['skipped'] += 1
                 continue
 
-            # Generate output path
-            if output_dir:
-                input_file = Path(file_path)
-                output_name = f"{input_file.stem}{config.OUTPUT_SUFFIX}.mp4"
-                output_path = os.path.join(output_dir, output_name)
-            else:
-                output_path = None
+            # Parallel jobs are dispatched once every file has been checked
+            if jobs > 1:
+                # movie.mkv and movie.avi both map to movie_converted.mp4
+                if output_name in queued:
+                    self.logger.warning(f"Skipping (same output as an earlier file): {file_path}")
+                    stats['skipped'] += 1
+                    continue
+
+                queued.add(output_name)
+                pending.append((file_path, output_path))
+                continue
 
             # Convert
             success = self.convert_video(file_path, output_path)
 
             if success:
                 stats['success'] += 1
+                if skip_existing:
+                    converted.add(output_name)
             else:
                 stats['failed'] += 1
 
+        if pending:
+            # Probe everything up front; workers then read the results from the
+            # probe cache (without it they would only probe each file again)
+            if config.USE_PROBE_CACHE:
+                utils.probe_files_batch([task[0] for task in pending], self.logger)
+                utils.save_probe_cache(self.logger)
+
+            # Start the largest files first so a long encode does not run alone at the end
+            pending.sort(key=lambda task: utils.get_file_size(task[0]), reverse=True)
+
+            for success in self._convert_parallel(pending, jobs):
+                if success:
+                    stats['success'] += 1
+                else:
+                    stats['failed'] += 1
+
         # Print summary
         self.logger.info(f"\n{'='*60}")
         self.logger.info("BATCH CONVERSION SUMMARY")
@@ -397,6 +947,224 @@ class VideoConverter:
 
         return stats
 
+    def get_batch_jobs(self, jobs: Optional[int] = None) -> int:
+        """
+        Resolve the number of parallel FFmpeg processes for batch mode
+
+        Args:
+            jobs: Requested job count (uses config default if None)
+
+        Returns:
+            Number of jobs, 1 meaning serial conversion
+        """
+        # A single hardware encoder session already saturates the device,
+        # and sharded conversions already run several encoders per file
+        if self.hw_profile or self.shards > 1:
+            return 1
+
+        if jobs is None:
+            jobs = config.BATCH_JOBS
+
+        if jobs is None:
+            threads_per_job = config.FFMPEG_THREADS or 1
+            jobs = (os.cpu_count() or 1) // threads_per_job
+
+        return max(1, jobs)
+
+    def _convert_parallel(self, tasks: List[Tuple[str, Optional[str]]], jobs: int) -> List[bool]:
+        """
+        Convert files concurrently in a pool of worker processes
+
+        Worker log records are sent back through a queue and emitted by this
+        process's handlers, so lines from different files never interleave.
+
+        Args:
+            tasks: List of (input_path, output_path) tuples
+            jobs: Number of worker processes
+
+        Returns:
+            List of conversion results, in completion order
+        """
+        jobs = min(jobs, len(tasks))
+        self.logger.info(
+            f"Converting {len(tasks)} file(s) with {jobs} parallel jobs "
+            f"({config.FFMPEG_THREADS or 'auto'} threads each)"
+        )
+
+        log_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(log_queue, *self.logger.handlers, respect_handler_level=True)
+        listener.start()
+
+        # Set on Ctrl+C so files already handed to a worker are not started
+        stop_event = multiprocessing.Event()
+
+        results = []
+        try:
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_batch_worker,
+                initargs=(
+                    log_queue, stop_event, self.logger.getEffectiveLevel(),
+                    self.crf, self.preset, config.FFMPEG_THREADS
+                )
+            ) as executor:
+                futures = {
+                    executor.submit(_convert_in_worker, input_path, output_path): input_path
+                    for input_path, output_path in tasks
+                }
+
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        input_path = futures[future]
+                        try:
+                            success = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Conversion failed: {input_path}: {e}")
+                            success = False
+
+                        status = 'done' if success else 'failed'
+                        self.logger.info(f"Finished file {done}/{len(tasks)}: {os.path.basename(input_path)} ({status})")
+                        results.append(success)
+                except BaseException:
+                    # Leaving the with block would otherwise run every queued file
+                    stop_event.set()
+                    for future in futures:
+                        future.cancel()
+                    executor.shutdown(wait=True)
+                    raise
+        finally:
+            listener.stop()
+
+        return results
+
+
+def _shard_cut_points(duration: float, keyframes: List[float], n_shards: int) -> List[float]:
+    """
+    Choose segment boundaries at the keyframes closest to equal splits
+
+    Args:
+        duration: Video duration in seconds
+        keyframes: Keyframe timestamps in seconds from the start of the file
+        n_shards: Number of segments wanted
+
+    Returns:
+        Sorted cut points from 0 to duration (fewer than n_shards + 1 when
+        keyframes are too sparse)
+    """
+    boundaries = set()
+    if keyframes:
+        for shard_idx in range(1, n_shards):
+            target = duration * shard_idx / n_shards
+            nearest = min(keyframes, key=lambda t: abs(t - target))
+            if 0 < nearest < duration:
+                boundaries.add(nearest)
+
+    return [0.0] + sorted(boundaries) + [duration]
+
+
+def _fill_template(template: List[str], input_path: str, output_path: str) -> List[str]:
+    """
+    Substitute the input and output paths into a command template
+
+    Args:
+        template: Result of VideoConverter.build_command_template()
+        input_path: Path to input file
+        output_path: Path to output file
+
+    Returns:
+        FFmpeg command as list of arguments
+    """
+    return [
+        input_path if arg == INPUT_PLACEHOLDER else output_path if arg == OUTPUT_PLACEHOLDER else arg
+        for arg in template
+    ]
+
+
+def _parse_number(value: Optional[bytes], cast):
+    """
+    Convert an FFmpeg progress value to a number
+
+    Args:
+        value: Raw ASCII value (may be None or b'N/A')
+        cast: Numeric type to convert to
+
+    Returns:
+        Converted value, or None if not numeric
+    """
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _FileLogAdapter(logging.LoggerAdapter):
+    """Prefix log messages with the file a batch worker is converting"""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['file']}] {msg}", kwargs
+
+
+# Converter instance owned by each batch worker process
+_worker_converter = None
+
+# Event shared by the batch workers, set once the batch is interrupted
+_worker_stop_event = None
+
+
+def _init_batch_worker(log_queue, stop_event, log_level: int, crf: int, preset: str, threads: int):
+    """
+    Initialize a batch worker process
+
+    Args:
+        log_queue: Queue forwarding log records to the parent process
+        stop_event: Event set when the batch is interrupted
+        log_level: Logging level of the parent logger
+        crf: CRF value
+        preset: Encoding preset
+        threads: FFmpeg threads per conversion
+    """
+    global _worker_converter, _worker_stop_event
+
+    _worker_stop_event = stop_event
+
+    logger = logging.getLogger('video_converter')
+    logger.handlers.clear()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(log_level)
+    logger.propagate = False
+
+    _worker_converter = VideoConverter(logger, crf, preset, threads)
+
+
+def _convert_in_worker(input_path: str, output_path: Optional[str]) -> bool:
+    """
+    Convert a single file inside a batch worker process
+
+    Args:
+        input_path: Path to input video file
+        output_path: Optional output path (auto-generated if None)
+
+    Returns:
+        True if conversion successful, False otherwise (also when the batch
+        was interrupted before this file started)
+    """
+    if _worker_stop_event.is_set():
+        return False
+
+    _worker_converter.logger = _FileLogAdapter(
+        logging.getLogger('video_converter'),
+        {'file': os.path.basename(input_path)}
+    )
+    try:
+        return _worker_converter.convert_video(input_path, output_path)
+    except KeyboardInterrupt:
+        # Ctrl+C reaches every worker; files they have queued are skipped
+        _worker_stop_event.set()
+        raise
+    finally:
+        # Pool workers do not run atexit handlers
+        utils.save_probe_cache(_worker_converter.logger)
+
 
 def main():
     """Main entry point"""
@@ -444,6 +1212,12 @@ def main():
         choices=['high', 'balanced', 'compressed'],
         help='Quality preset (overrides --crf and --preset)'
     )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=1,
+        help='Split each re-encoded video into N segments encoded in parallel (default=1)'
+    )
 
     # Batch options
     parser.add_argument(
@@ -451,6 +1225,11 @@ def main():
         action='store_true',
         help='Do not skip already converted files in batch mode'
     )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        help='Number of files converted in parallel in batch mode (default: CPU cores / FFMPEG_THREADS)'
+    )
 
     # Logging options
     parser.add_argument(
@@ -470,13 +1249,14 @@ def main():
     logger = utils.setup_logging(args.log_file, args.verbose)
 
     # Check FFmpeg availability
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    ffmpeg_info = utils.get_ffmpeg_info()
+    if ffmpeg_info is None:
         logger.error("FFmpeg is not installed or not in PATH")
         logger.error("Install FFmpeg: https://ffmpeg.org/download.html")
         sys.exit(1)
 
+    logger.debug(f"Using {ffmpeg_info['version']} ({ffmpeg_info['path']})")
+
     # Apply quality preset if specified
     crf = args.crf
     preset = args.preset
@@ -488,7 +1268,7 @@ def main():
         logger.info(f"Using {args.quality} quality preset (CRF={crf}, preset={preset})")
 
     # Create converter
-    converter = VideoConverter(logger, crf, preset)
+    converter = VideoConverter(logger, crf, preset, shards=args.shards)
 
     # Batch mode
     if args.input_dir:
@@ -496,7 +1276,7 @@ def main():
         output_dir = args.output_dir if args.output_dir else config.OUTPUT_DIR
         skip_existing = not args.no_skip_existing
 
-        stats = converter.convert_batch(input_dir, output_dir, skip_existing)
+        stats = converter.convert_batch(input_dir, output_dir, skip_existing, args.jobs)
 
         if stats['failed'] > 0:
             sys.exit(1)
@@ -0,0 +1,216 @@
+"""
+Move the moov atom of an MP4 file in front of the media data (qt-faststart)
+
+This is what FFmpeg's `-movflags +faststart` does, done directly on the file
+when no stream needs to be re-encoded or remuxed.
+"""
+
+import logging
+import os
+import shutil
+import struct
+import tempfile
+from typing import BinaryIO, List, Tuple
+
+# Atoms on the path from moov to the chunk offset tables
+CONTAINER_ATOMS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+# Copy chunk size when writing the reordered file
+COPY_CHUNK_SIZE = 1 << 20
+
+
+def read_top_level_atoms(f: BinaryIO) -> List[Tuple[bytes, int, int]]:
+    """
+    List the top-level atoms of an MP4 file
+
+    Args:
+        f: File opened in binary mode
+
+    Returns:
+        List of (atom_type, offset, size) tuples in file order
+
+    Raises:
+        ValueError: If an atom header is invalid
+    """
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+
+    atoms = []
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        size, atom_type = struct.unpack('>I4s', f.read(8))
+
+        if size == 1:
+            # 64-bit extended size follows the type
+            size = struct.unpack('>Q', f.read(8))[0]
+        elif size == 0:
+            # Atom extends to the end of the file
+            size = file_size - offset
+
+        if size < 8 or offset + size > file_size:
+            raise ValueError(f"Invalid {atom_type!r} atom size at offset {offset}")
+
+        atoms.append((atom_type, offset, size))
+        offset += size
+
+    return atoms
+
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, shift: int) -> None:
+    """
+    Add shift to every stco/co64 chunk offset inside moov[start:end]
+
+    Args:
+        moov: moov atom contents (modified in place)
+        start: Offset of the first child atom
+        end: End offset of the parent atom
+        shift: Number of bytes the media data moves by
+
+    Raises:
+        ValueError: If the atom tree is invalid or an offset overflows stco
+    """
+    pos = start
+    while pos + 8 <= end:
+        size, atom_type = struct.unpack_from('>I4s', moov, pos)
+        header_size = 8
+
+        if size == 1:
+            size = struct.unpack_from('>Q', moov, pos + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+
+        if size < header_size or pos + size > end:
+            raise ValueError(f"Invalid {atom_type!r} atom size inside moov")
+
+        if atom_type in CONTAINER_ATOMS:
+            _shift_chunk_offsets(moov, pos + header_size, pos + size, shift)
+
+        elif atom_type in (b'stco', b'co64'):
+            # Full atom: version/flags (4 bytes), entry count (4 bytes), entries
+            entry_format = 'I' if atom_type == b'stco' else 'Q'
+            count = struct.unpack_from('>I', moov, pos + header_size + 4)[0]
+            table = pos + header_size + 8
+            if table + count * struct.calcsize(entry_format) > pos + size:
+                raise ValueError(f"Truncated {atom_type!r} table")
+
+            offsets = [value + shift for value in struct.unpack_from(f'>{count}{entry_format}', moov, table)]
+            if entry_format == 'I' and offsets and max(offsets) > 0xFFFFFFFF:
+                raise ValueError("Chunk offset overflows 32-bit stco table")
+
+            struct.pack_into(f'>{count}{entry_format}', moov, table, *offsets)
+
+        elif atom_type == b'cmov':
+            raise ValueError("Compressed moov atoms are not supported")
+
+        pos += size
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, offset: int, size: int) -> None:
+    """
+    Copy size bytes starting at offset from src to dst
+
+    Args:
+        src: Source file
+        dst: Destination file
+        offset: Start offset in src
+        size: Number of bytes to copy
+    """
+    src.seek(offset)
+    remaining = size
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise ValueError("Unexpected end of file")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def relocate_moov(input_path: str, output_path: str, logger: logging.Logger) -> bool:
+    """
+    Write a copy of an MP4 file with the moov atom before the media data
+
+    The copy is written to a temporary file next to output_path and only
+    moved into place once complete, so a failure never leaves a partial
+    output or touches an existing file.
+
+    Args:
+        input_path: Path to input MP4 file
+        output_path: Path to output file
+        logger: Logger instance
+
+    Returns:
+        True if the output was written, False if the file layout is not supported
+    """
+    tmp_path = None
+
+    try:
+        if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            logger.warning("Output file is the input file, cannot relocate moov in place")
+            return False
+
+        with open(input_path, 'rb') as src:
+            atoms = read_top_level_atoms(src)
+            atom_types = [atom[0] for atom in atoms]
+
+            if b'moov' not in atom_types or b'mdat' not in atom_types:
+                logger.debug("No moov/mdat atoms found, cannot relocate moov")
+                return False
+
+            if b'moof' in atom_types:
+                logger.debug("Fragmented MP4, cannot relocate moov")
+                return False
+
+            moov_idx = atom_types.index(b'moov')
+            first_mdat_idx = atom_types.index(b'mdat')
+            moov_at_end = moov_idx > first_mdat_idx
+
+            # Offsets into media data on both sides of moov would shift differently
+            if moov_at_end and b'mdat' in atom_types[moov_idx + 1:]:
+                logger.debug("Media data found after moov, cannot relocate moov")
+                return False
+
+            _, moov_offset, moov_size = atoms[moov_idx]
+
+            src.seek(moov_offset)
+            moov = bytearray(src.read(moov_size))
+
+            # Media data between the first mdat and moov moves down by the size of moov
+            if moov_at_end:
+                header_size = 16 if struct.unpack_from('>I', moov)[0] == 1 else 8
+                _shift_chunk_offsets(moov, header_size, moov_size, moov_size)
+                logger.debug(f"Moving {moov_size} byte moov atom in front of media data")
+
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{os.path.basename(output_path)}.",
+                suffix='.tmp',
+                dir=os.path.dirname(os.path.abspath(output_path))
+            )
+            with os.fdopen(fd, 'wb') as dst:
+                # Atoms before the media data (ftyp, ...) keep their place
+                for atom_type, offset, size in atoms[:first_mdat_idx]:
+                    if atom_type != b'moov':
+                        _copy_range(src, dst, offset, size)
+
+                dst.write(moov)
+
+                for atom_type, offset, size in atoms[first_mdat_idx:]:
+                    if atom_type != b'moov':
+                        _copy_range(src, dst, offset, size)
+
+        # mkstemp creates the file owner-only, give it the input's permissions
+        shutil.copymode(input_path, tmp_path)
+        os.replace(tmp_path, output_path)
+        tmp_path = None
+
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Could not relocate moov atom: {e}")
+        return False
+
+    finally:
+        # Also reached on Ctrl+C, which would leave a full-size hidden file behind
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return True
@@ -0,0 +1,226 @@
+"""
+Tests for VideoConverter safety checks
+"""
+
+import logging
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import config
+import converter as converter_module
+import utils
+from converter import VideoConverter
+
+LOGGER = logging.getLogger('test_converter')
+
+
+class ConvertVideoTest(unittest.TestCase):
+    """convert_video input/output checks that run before FFmpeg"""
+
+    def test_output_equal_to_input_is_refused(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, 'movie.mp4')
+            with open(input_path, 'wb') as f:
+                f.write(b'not really a movie')
+
+            converter = VideoConverter(LOGGER)
+            same_file = os.path.join(tmp_dir, '.', 'movie.mp4')
+
+            self.assertFalse(converter.convert_video(input_path, same_file))
+            with open(input_path, 'rb') as f:
+                self.assertEqual(f.read(), b'not really a movie')
+
+    def test_streams_are_grouped_once_per_file(self):
+        probe_data = {
+            'format': {'format_name': 'mov,mp4,m4a,3gp,3g2,mj2', 'duration': '60.0'},
+            'streams': [
+                {'codec_type': 'video', 'codec_name': 'hevc', 'pix_fmt': 'yuv420p'},
+                {'codec_type': 'audio', 'codec_name': 'ac3', 'channels': 6, 'tags': {'language': 'fre'}},
+                {'codec_type': 'subtitle', 'codec_name': 'subrip', 'tags': {'language': 'eng'}},
+            ],
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, 'movie.mp4')
+            with open(input_path, 'wb') as f:
+                f.write(b'not really a movie')
+
+            converter = VideoConverter(LOGGER)
+            with mock.patch.object(utils, 'probe_file', return_value=probe_data), \
+                    mock.patch.object(utils, 'get_streams_info', wraps=utils.get_streams_info) as get_streams_info, \
+                    mock.patch.object(converter, '_run_ffmpeg', return_value=False):
+                self.assertFalse(converter.convert_video(input_path, os.path.join(tmp_dir, 'out.mp4')))
+
+            self.assertEqual(get_streams_info.call_count, 1)
+
+    def test_refresh_rebuilds_cached_command_templates(self):
+        probe_data = {'streams': [
+            {'codec_type': 'video', 'codec_name': 'h264', 'pix_fmt': 'yuv420p'},
+            {'codec_type': 'audio', 'codec_name': 'ac3', 'tags': {'language': 'eng'}},
+            {'codec_type': 'audio', 'codec_name': 'ac3', 'tags': {'language': 'xyz'}},
+        ]}
+        converter = VideoConverter(LOGGER)
+
+        def audio_maps():
+            streams = utils.get_streams_info(probe_data, LOGGER)
+            cmd = converter.build_ffmpeg_command('in.mkv', 'out.mp4', probe_data, streams)
+            return [cmd[idx + 1] for idx, arg in enumerate(cmd) if arg == '-map' and ':a:' in cmd[idx + 1]]
+
+        self.assertEqual(audio_maps(), ['0:a:0', '0:a:1'])
+
+        self.addCleanup(utils.refresh)
+        with mock.patch.object(config, 'FRENCH_LANGUAGE_CODES', config.FRENCH_LANGUAGE_CODES + ['xyz']):
+            utils.refresh()
+            self.assertEqual(audio_maps(), ['0:a:1', '0:a:0'])
+
+
+class ConvertBatchTest(unittest.TestCase):
+    """convert_batch dispatch of parallel jobs"""
+
+    def test_parallel_jobs_never_share_an_output(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_dir = os.path.join(tmp_dir, 'input')
+            os.mkdir(input_dir)
+            for name in ('movie.mkv', 'movie.avi', 'movie.mp4', 'other.mkv'):
+                with open(os.path.join(input_dir, name), 'wb') as f:
+                    f.write(b'not really a movie')
+
+            converter = VideoConverter(LOGGER)
+            with mock.patch.object(utils, 'probe_files_batch'), \
+                    mock.patch.object(converter, '_convert_parallel', return_value=[True, True]) as convert_parallel:
+                stats = converter.convert_batch(input_dir, os.path.join(tmp_dir, 'output'), jobs=2)
+
+        tasks = convert_parallel.call_args[0][0]
+        output_names = [os.path.basename(output_path) for _, output_path in tasks]
+        self.assertEqual(sorted(output_names), ['movie_converted.mp4', 'other_converted.mp4'])
+        self.assertEqual(stats['skipped'], 2)
+
+    def test_no_prefetch_without_probe_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in ('movie.mkv', 'other.mkv'):
+                with open(os.path.join(tmp_dir, name), 'wb') as f:
+                    f.write(b'not really a movie')
+
+            converter = VideoConverter(LOGGER)
+            with mock.patch.object(config, 'USE_PROBE_CACHE', False), \
+                    mock.patch.object(utils, 'probe_files_batch') as probe_files_batch, \
+                    mock.patch.object(converter, '_convert_parallel', return_value=[True, True]):
+                converter.convert_batch(tmp_dir, os.path.join(tmp_dir, 'output'), jobs=2)
+
+        probe_files_batch.assert_not_called()
+
+    def test_interrupt_stops_queued_files(self):
+        worker_converter = mock.Mock()
+        worker_converter.convert_video.side_effect = [KeyboardInterrupt, True, True, True]
+
+        def init_worker(log_queue, stop_event, *args):
+            converter_module._worker_stop_event = stop_event
+            converter_module._worker_converter = worker_converter
+
+        tasks = [(f'movie{idx}.mkv', f'movie{idx}_converted.mp4') for idx in range(4)]
+        converter = VideoConverter(LOGGER)
+
+        # Threads stand in for worker processes so the stub converter is shared
+        with mock.patch.object(converter_module, 'ProcessPoolExecutor', ThreadPoolExecutor), \
+                mock.patch.object(converter_module, '_init_batch_worker', init_worker), \
+                mock.patch.object(converter_module, '_worker_converter'), \
+                mock.patch.object(converter_module, '_worker_stop_event'):
+            with self.assertRaises(KeyboardInterrupt):
+                converter._convert_parallel(tasks, jobs=1)
+
+        self.assertEqual(worker_converter.convert_video.call_count, 1)
+
+
+class ShardedConversionTest(unittest.TestCase):
+    """Segment boundaries and failures of convert_video_sharded"""
+
+    probe_data = {
+        'format': {'duration': '100.0', 'start_time': '1.400000'},
+        'streams': [{'codec_type': 'video', 'codec_name': 'hevc', 'pix_fmt': 'yuv420p'}],
+    }
+
+    def setUp(self):
+        self.converter = VideoConverter(LOGGER, shards=2)
+        self.streams = utils.get_streams_info(self.probe_data, LOGGER)
+
+    def test_cut_points_snap_to_the_nearest_keyframes(self):
+        cut_points = converter_module._shard_cut_points(100.0, [0.0, 24.0, 47.0, 52.0, 77.0], 4)
+        self.assertEqual(cut_points, [0.0, 24.0, 52.0, 77.0, 100.0])
+
+    def test_cut_points_without_keyframes_keep_one_segment(self):
+        self.assertEqual(converter_module._shard_cut_points(100.0, [], 4), [0.0, 100.0])
+        self.assertEqual(converter_module._shard_cut_points(100.0, [0.0], 4), [0.0, 100.0])
+
+    def test_segments_are_relative_to_the_container_start(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with mock.patch.object(utils, 'get_keyframe_times', return_value=[1.4, 26.4, 51.4, 76.4]), \
+                    mock.patch.object(self.converter, '_encode_shard', return_value=True) as encode_shard, \
+                    mock.patch.object(self.converter, '_run_ffmpeg', return_value=True):
+                self.assertTrue(self.converter.convert_video_sharded(
+                    'in.mkv', os.path.join(tmp_dir, 'out.mp4'), self.probe_data, self.streams, 2
+                ))
+
+        segments = sorted((call[0][2], call[0][3]) for call in encode_shard.call_args_list)
+        self.assertEqual(segments, [(0.0, 50.0), (50.0, None)])
+
+    def test_missing_output_directory_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, 'missing', 'out.mp4')
+            with mock.patch.object(utils, 'get_keyframe_times', return_value=[1.4, 51.4]):
+                self.assertFalse(self.converter.convert_video_sharded(
+                    'in.mkv', output_path, self.probe_data, self.streams, 2
+                ))
+
+
+def hevc_streams(pix_fmt: str) -> utils.StreamsInfo:
+    """Streams of a file with one HEVC video track in the given pixel format"""
+    return utils.StreamsInfo(video=[{'codec_type': 'video', 'codec_name': 'hevc', 'pix_fmt': pix_fmt}])
+
+
+class HardwareCommandTest(unittest.TestCase):
+    """Hardware decode choice and software retry with the nvenc profile"""
+
+    def setUp(self):
+        self.converter = VideoConverter(LOGGER)
+        self.converter.hw_profile = config.HW_ENCODER_PROFILES['nvenc']
+        self.converter._build_static_args()
+
+    def test_8bit_source_stays_on_the_device(self):
+        template = self.converter.build_command_template(hevc_streams('yuv420p'))
+
+        self.assertIn('hevc_cuvid', template)
+        self.assertIn('-hwaccel_output_format', template)
+        self.assertIn('scale_cuda=format=yuv420p', template)
+
+    def test_10bit_source_is_decoded_to_system_memory(self):
+        template = self.converter.build_command_template(hevc_streams('yuv420p10le'))
+
+        self.assertNotIn('hevc_cuvid', template)
+        self.assertNotIn('-hwaccel_output_format', template)
+        self.assertNotIn('-vf', template)
+        self.assertIn('h264_nvenc', template)
+        self.assertEqual(template[template.index('-pix_fmt') + 1], 'yuv420p')
+
+    def test_failed_hardware_encode_is_retried_in_software(self):
+        probe_data = {'format': {'duration': '60.0'}, 'streams': hevc_streams('yuv420p').video}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, 'movie.mkv')
+            with open(input_path, 'wb') as f:
+                f.write(b'not really a movie')
+
+            with mock.patch.object(utils, 'probe_file', return_value=probe_data), \
+                    mock.patch.object(self.converter, '_run_ffmpeg', return_value=False) as run_ffmpeg:
+                self.assertFalse(self.converter.convert_video(input_path, os.path.join(tmp_dir, 'out.mp4')))
+
+        self.assertEqual(run_ffmpeg.call_count, 2)
+        retry_cmd = run_ffmpeg.call_args_list[1][0][0]
+        self.assertIn(config.VIDEO_CODEC, retry_cmd)
+        self.assertNotIn('-hwaccel', retry_cmd)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Tests for faststart.relocate_moov on synthetic MP4 files
+"""
+
+import logging
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import faststart
+
+LOGGER = logging.getLogger('test_faststart')
+
+
+def atom(atom_type: bytes, payload: bytes) -> bytes:
+    """Build an atom with a 32-bit size header"""
+    return struct.pack('>I4s', 8 + len(payload), atom_type) + payload
+
+
+def chunk_offset_atom(offsets, large: bool = False) -> bytes:
+    """Build an stco (or co64) atom listing chunk offsets"""
+    entry_format = 'Q' if large else 'I'
+    payload = struct.pack('>II', 0, len(offsets)) + struct.pack(f'>{len(offsets)}{entry_format}', *offsets)
+    return atom(b'co64' if large else b'stco', payload)
+
+
+def moov_atom(offsets, large: bool = False) -> bytes:
+    """Build a moov atom with one track pointing at the given chunk offsets"""
+    stbl = atom(b'stbl', chunk_offset_atom(offsets, large))
+    return atom(b'moov', atom(b'trak', atom(b'mdia', atom(b'minf', stbl))))
+
+
+def read_chunk_offsets(data: bytes):
+    """Return the chunk offsets of the first stco/co64 table in data"""
+    for atom_type, entry_format in ((b'stco', 'I'), (b'co64', 'Q')):
+        pos = data.find(atom_type)
+        if pos != -1:
+            count = struct.unpack_from('>I', data, pos + 8)[0]
+            return list(struct.unpack_from(f'>{count}{entry_format}', data, pos + 12))
+    return None
+
+
+FTYP = atom(b'ftyp', b'isom\0\0\2\0isomiso2avc1mp41')
+CHUNKS = [b'chunk-one', b'chunk-two!', b'chunk-3']
+
+
+def build_mp4(moov_first: bool = False, large: bool = False, extra: bytes = b'') -> bytes:
+    """Build an MP4 file whose chunk offsets point at the CHUNKS in mdat"""
+    mdat_payload = b''.join(CHUNKS)
+    mdat = atom(b'mdat', mdat_payload)
+    moov_size = len(moov_atom([0] * len(CHUNKS), large))
+
+    data_start = len(FTYP) + (moov_size if moov_first else 0) + 8
+    offsets = []
+    pos = data_start
+    for chunk in CHUNKS:
+        offsets.append(pos)
+        pos += len(chunk)
+
+    moov = moov_atom(offsets, large)
+    body = moov + mdat if moov_first else mdat + moov
+    return FTYP + body + extra
+
+
+class RelocateMoovTest(unittest.TestCase):
+    """relocate_moov on well-formed and unsupported layouts"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp_dir.name, 'input.mp4')
+        self.output_path = os.path.join(self.tmp_dir.name, 'output.mp4')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_input(self, data: bytes) -> None:
+        with open(self.input_path, 'wb') as f:
+            f.write(data)
+
+    def read_output(self) -> bytes:
+        with open(self.output_path, 'rb') as f:
+            return f.read()
+
+    def assert_chunks_readable(self, data: bytes) -> None:
+        for offset, chunk in zip(read_chunk_offsets(data), CHUNKS):
+            self.assertEqual(data[offset:offset + len(chunk)], chunk)
+
+    def assert_no_output(self) -> None:
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['input.mp4'])
+
+    def test_moov_at_end_is_moved_before_mdat(self):
+        self.write_input(build_mp4())
+
+        self.assertTrue(faststart.relocate_moov(self.input_path, self.output_path, LOGGER))
+
+        output = self.read_output()
+        with open(self.output_path, 'rb') as f:
+            atom_types = [entry[0] for entry in faststart.read_top_level_atoms(f)]
+        self.assertEqual(atom_types, [b'ftyp', b'moov', b'mdat'])
+        self.assertEqual(len(output), os.path.getsize(self.input_path))
+        self.assert_chunks_readable(output)
+
+    def test_moov_already_first_is_copied_unchanged(self):
+        data = build_mp4(moov_first=True)
+        self.write_input(data)
+
+        self.assertTrue(faststart.relocate_moov(self.input_path, self.output_path, LOGGER))
+        self.assertEqual(self.read_output(), data)
+
+    def test_co64_offsets_are_shifted(self):
+        self.write_input(build_mp4(large=True))
+
+        self.assertTrue(faststart.relocate_moov(self.input_path, self.output_path, LOGGER))
+
+        output = self.read_output()
+        self.assertIn(b'co64', output)
+        self.assert_chunks_readable(output)
+
+    def test_stco_overflow_is_rejected(self):
+        moov = bytearray(moov_atom([0xFFFFFFF0]))
+        with self.assertRaises(ValueError):
+            faststart._shift_chunk_offsets(moov, 8, len(moov), 0x100)
+
+        # Same layout as build_mp4() but with a chunk offset near 4 GB
+        self.write_input(FTYP + atom(b'mdat', b'data') + moov_atom([0xFFFFFFF0]))
+
+        self.assertFalse(faststart.relocate_moov(self.input_path, self.output_path, LOGGER))
+        self.assert_no_output()
+
+    def test_fragmented_file_is_rejected(self):
+        self.write_input(build_mp4(extra=atom(b'moof', b'') + atom(b'mdat', b'fragment')))
+
+        self.assertFalse(faststart.relocate_moov(self.input_path, self.output_path, LOGGER))
+        self.assert_no_output()
+
+    def test_same_input_and_output_keeps_the_input(self):
+        data = build_mp4()
+        self.write_input(data)
+
+        self.assertFalse(faststart.relocate_moov(self.input_path, self.input_path, LOGGER))
+
+        with open(self.input_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assert_no_output()
+
+    def test_failure_keeps_existing_output(self):
+        self.write_input(build_mp4())
+        with open(self.output_path, 'wb') as f:
+            f.write(b'previous output')
+
+        # Fail while the media data is being copied, after the moov was written
+        copy_range = faststart._copy_range
+        calls = []
+
+        def failing_copy_range(src, dst, offset, size):
+            calls.append(offset)
+            if len(calls) > 1:
+                raise OSError("disk full")
+            copy_range(src, dst, offset, size)
+
+        with mock.patch('faststart._copy_range', failing_copy_range):
+            self.assertFalse(faststart.relocate_moov(self.input_path, self.output_path, LOGGER))
+
+        self.assertEqual(self.read_output(), b'previous output')
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ['input.mp4', 'output.mp4'])
+
+    def test_interrupt_removes_temporary_file(self):
+        self.write_input(build_mp4())
+
+        with mock.patch('faststart._copy_range', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                faststart.relocate_moov(self.input_path, self.output_path, LOGGER)
+
+        self.assert_no_output()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for utils helpers
+"""
+
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import config
+import utils
+
+
+class IsConvertedOutputTest(unittest.TestCase):
+    """utils.is_converted_output naming rules"""
+
+    def test_converter_outputs_are_recognized(self):
+        self.assertTrue(utils.is_converted_output('/videos/movie_converted.mp4'))
+        self.assertTrue(utils.is_converted_output('movie_converted.MP4'))
+
+    def test_regular_inputs_are_not_outputs(self):
+        self.assertFalse(utils.is_converted_output('/videos/movie.mp4'))
+        self.assertFalse(utils.is_converted_output('/videos/movie_converted.mkv'))
+        self.assertFalse(utils.is_converted_output('/videos/movie_converted_cut.mp4'))
+
+
+class GetStreamsInfoTest(unittest.TestCase):
+    """French track detection in get_streams_info"""
+
+    def test_french_tracks_are_located_and_logged(self):
+        probe_data = {'streams': [
+            {'codec_type': 'video', 'codec_name': 'h264'},
+            {'codec_type': 'audio', 'tags': {'language': 'eng'}},
+            {'codec_type': 'audio', 'tags': {'language': 'fre'}},
+            {'codec_type': 'subtitle', 'tags': {'title': 'Français (French)'}},
+        ]}
+
+        with self.assertLogs('test_utils', level='INFO') as logs:
+            info = utils.get_streams_info(probe_data, logging.getLogger('test_utils'))
+
+        self.assertEqual(info.french_audio_idx, 1)
+        self.assertEqual(info.french_subtitle_idx, 0)
+        self.assertIn('Found French audio stream at index 1 (language: fre)', '\n'.join(logs.output))
+        self.assertIn('Found French subtitle stream at index 0 (title: français (french))', '\n'.join(logs.output))
+
+
+class FFmpegInfoCacheTest(unittest.TestCase):
+    """get_ffmpeg_info cache hits and writes"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        self.ffmpeg_path = os.path.join(self.tmp_dir.name, 'ffmpeg')
+        with open(self.ffmpeg_path, 'w') as f:
+            f.write('')
+        self.mtime_ns = os.stat(self.ffmpeg_path).st_mtime_ns
+
+        self.cache_file = os.path.join(self.tmp_dir.name, 'ffmpeg_cache.json')
+        for patcher in (
+            mock.patch.object(config, 'FFMPEG_CACHE_FILE', self.cache_file),
+            mock.patch('shutil.which', return_value=self.ffmpeg_path),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        utils.get_ffmpeg_info.cache_clear()
+        self.addCleanup(utils.get_ffmpeg_info.cache_clear)
+
+    def run_ffmpeg_info(self, encoders):
+        version = mock.Mock(stdout='ffmpeg version 7.0\n')
+        with mock.patch('subprocess.run', return_value=version), \
+                mock.patch.object(utils, '_list_ffmpeg_encoders', return_value=encoders):
+            return utils.get_ffmpeg_info()
+
+    def test_partial_cache_entry_is_a_miss(self):
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'path': self.ffmpeg_path, 'mtime_ns': self.mtime_ns}, f)
+
+        info = self.run_ffmpeg_info(['libx264'])
+
+        self.assertEqual(info['version'], 'ffmpeg version 7.0')
+        self.assertEqual(info['encoders'], ['libx264'])
+
+    def test_empty_encoder_list_is_not_cached(self):
+        info = self.run_ffmpeg_info([])
+
+        self.assertEqual(info['encoders'], [])
+        self.assertFalse(os.path.exists(self.cache_file))
+
+
+class ProbeCacheTest(unittest.TestCase):
+    """Persistent probe cache entries and the ffprobe fields they hold"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, 'movie.mkv')
+        with open(self.video_path, 'wb') as f:
+            f.write(b'not really a movie')
+
+        cache_file = os.path.join(self.tmp_dir.name, 'probe_cache.json')
+        patcher = mock.patch.object(config, 'PROBE_CACHE_FILE', cache_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, utils, '_probe_cache', None)
+        self.addCleanup(utils._probe_cache_dirty.clear)
+        self.addCleanup(utils._probe_cache_stale.clear)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_entry(self, entries):
+        file_id = utils._probe_file_id(self.video_path)
+        path, size, mtime_ns = file_id
+        entry = {'size': size, 'mtime_ns': mtime_ns, 'data': {'streams': []}}
+        if entries is not None:
+            entry['entries'] = entries
+        with open(config.PROBE_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({path: entry}, f)
+        utils._probe_cache = None
+        return file_id
+
+    def test_entry_probed_for_current_fields_is_used(self):
+        file_id = self.write_entry(utils.PROBE_ENTRIES)
+        self.assertEqual(utils._get_cached_probe(file_id), {'streams': []})
+
+    def test_entry_probed_for_other_fields_is_a_miss(self):
+        file_id = self.write_entry('format=duration:stream=index,codec_type,codec_name')
+        self.assertIsNone(utils._get_cached_probe(file_id))
+
+    def test_entry_without_field_list_is_a_miss(self):
+        file_id = self.write_entry(None)
+        self.assertIsNone(utils._get_cached_probe(file_id))
+
+    def read_cache_file(self):
+        with open(config.PROBE_CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_unreachable_files_keep_their_entries(self):
+        path, _, _ = self.write_entry(utils.PROBE_ENTRIES)
+        missing_id = (os.path.join(self.tmp_dir.name, 'unmounted.mkv'), 1, 1)
+        utils._put_cached_probe(missing_id, {'streams': []})
+
+        utils.save_probe_cache()
+
+        self.assertEqual(sorted(self.read_cache_file()), sorted([path, missing_id[0]]))
+
+    def test_changed_file_entry_is_evicted(self):
+        path, size, mtime_ns = self.write_entry(utils.PROBE_ENTRIES)
+        with open(self.video_path, 'ab') as f:
+            f.write(b' with more data')
+
+        self.assertIsNone(utils._get_cached_probe(utils._probe_file_id(self.video_path)))
+        utils.save_probe_cache()
+
+        self.assertNotIn(path, self.read_cache_file())
+
+
+if __name__ == '__main__':
+    unittest.main()
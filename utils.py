@@ -2,16 +2,94 @@
 Utility functions for video conversion
 """
 
+import asyncio
+import atexit
+import functools
 import json
 import subprocess
 import logging
+import logging.handlers
 import os
-from pathlib import Path
+import queue
+import re
+import shutil
+import stat
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ffprobe output parser, orjson when installed (both accept bytes)
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Linear-time regex engine when google-re2 is installed
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Log records buffered before the log file is written
+LOG_BUFFER_CAPACITY = 512
+
+# Shared read-only default for streams without tags
+_EMPTY: Mapping[str, str] = MappingProxyType({})
+
+# Lookups derived from config, rebuilt by refresh()
+_SUPPORTED_FORMATS = frozenset(config.SUPPORTED_FORMATS)
+_FRENCH_CODES = tuple(config.FRENCH_LANGUAGE_CODES)
+_FRENCH_EXACT = frozenset(_FRENCH_CODES)
+
+
+def _compile_french_re(codes: Tuple[str, ...]):
+    """
+    Compile one case-insensitive alternation matching any French language code
+
+    Longer codes come first so 'french' is matched whole rather than as 'fr'.
+    The inline (?i) flag keeps the pattern valid for re2 as well as re.
+
+    Args:
+        codes: French language codes
+
+    Returns:
+        Compiled pattern
+    """
+    alternatives = sorted(map(re.escape, codes), key=len, reverse=True)
+    return _regex.compile('(?i)' + '|'.join(alternatives))
+
+
+# Any French language code as a substring, one scan per tag value
+_FRENCH_RE = _compile_french_re(_FRENCH_CODES)
+
+# Number of refresh() calls, part of every stream signature
+_config_generation = 0
+
+
+def refresh() -> None:
+    """
+    Rebuild the lookups derived from config after changing it at runtime
+
+    Covers SUPPORTED_FORMATS, FRENCH_LANGUAGE_CODES and OUTPUT_SUFFIX;
+    cached audio mappings and output paths are dropped, and FFmpeg command
+    templates cached under an earlier get_stream_signature() are not reused.
+    """
+    global _SUPPORTED_FORMATS, _FRENCH_CODES, _FRENCH_EXACT, _FRENCH_RE, _config_generation
+
+    _SUPPORTED_FORMATS = frozenset(config.SUPPORTED_FORMATS)
+    _FRENCH_CODES = tuple(config.FRENCH_LANGUAGE_CODES)
+    _FRENCH_EXACT = frozenset(_FRENCH_CODES)
+    _FRENCH_RE = _compile_french_re(_FRENCH_CODES)
+    _audio_mapping_cache.clear()
+    _output_path_for.cache_clear()
+    _config_generation += 1
+
 
 def setup_logging(log_file: Optional[str] = None, verbose: bool = False) -> logging.Logger:
     """
@@ -31,6 +109,7 @@ def setup_logging(log_file: Optional[str] = None, verbose: bool = False) -> logg
     logger.setLevel(log_level)
 
     # Clear existing handlers
+    _stop_log_listener(logger)
     logger.handlers.clear()
 
     # Console handler
@@ -41,7 +120,7 @@ def setup_logging(log_file: Optional[str] = None, verbose: bool = False) -> logg
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # File handler
     if log_file:
@@ -55,18 +134,57 @@ def setup_logging(log_file: Optional[str] = None, verbose: bool = False) -> logg
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
+
+        # Write the file in batches; errors are written immediately
+        buffered_handler = logging.handlers.MemoryHandler(
+            capacity=LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        buffered_handler.setLevel(log_level)
+        handlers.append(buffered_handler)
+
+    # Logging calls only enqueue records, a listener thread does the writing
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.queue_listener = listener
+    atexit.register(_stop_log_listener, logger)
 
     return logger
 
 
-def probe_file(input_path: str, logger: logging.Logger) -> Dict:
+def _stop_log_listener(logger: logging.Logger) -> None:
+    """
+    Stop the queue listener started by setup_logging(), writing pending records
+
+    Args:
+        logger: Logger returned by setup_logging()
+    """
+    listener = getattr(logger, 'queue_listener', None)
+    if listener is None:
+        return
+
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+    logger.queue_listener = None
+
+
+def probe_file(input_path: str, logger: logging.Logger, use_cache: bool = True) -> Dict:
     """
     Probe video file to get stream information
 
+    Results are cached in memory and in config.PROBE_CACHE_FILE, keyed by the
+    file's absolute path and checked against its size and modification time,
+    so unchanged files are only probed once across runs.
+
     Args:
         input_path: Path to input video file
         logger: Logger instance
+        use_cache: Look up and store the result in the probe cache
 
     Returns:
         Dictionary containing stream information
@@ -74,161 +192,686 @@ def probe_file(input_path: str, logger: logging.Logger) -> Dict:
     Raises:
         RuntimeError: If ffprobe fails
     """
-    logger.debug(f"Probing file: {input_path}")
+    file_id = _probe_file_id(input_path) if use_cache else None
 
-    cmd = [
+    if file_id is not None:
+        cached = _get_cached_probe(file_id)
+        if cached is not None:
+            logger.debug("Using cached probe data: %s", input_path)
+            return cached
+
+    probe_data = _run_ffprobe(input_path, logger)
+
+    if file_id is not None:
+        _put_cached_probe(file_id, probe_data)
+
+    return probe_data
+
+
+def probe_files_batch(
+    paths: List[str],
+    logger: logging.Logger,
+    concurrency: Optional[int] = None
+) -> Dict[str, Optional[Dict]]:
+    """
+    Probe several files at once (synchronous wrapper for probe_files_async)
+
+    Args:
+        paths: Paths to video files
+        logger: Logger instance
+        concurrency: Maximum concurrent ffprobe processes (None = CPU cores, at most 8)
+
+    Returns:
+        Dictionary mapping each path to its probe data (None if probing failed)
+    """
+    return asyncio.run(probe_files_async(paths, logger, concurrency))
+
+
+async def probe_files_async(
+    paths: List[str],
+    logger: logging.Logger,
+    concurrency: Optional[int] = None
+) -> Dict[str, Optional[Dict]]:
+    """
+    Probe several files, running ffprobe concurrently for cache misses
+
+    Each ffprobe call mostly waits on process startup and disk reads, so up
+    to `concurrency` of them run at once. New results go to the in-memory
+    probe cache; call save_probe_cache() to share them with other processes.
+
+    Args:
+        paths: Paths to video files
+        logger: Logger instance
+        concurrency: Maximum concurrent ffprobe processes (None = CPU cores, at most 8)
+
+    Returns:
+        Dictionary mapping each path to its probe data (None if probing failed)
+    """
+    results = {}
+    misses = {}
+
+    for path in paths:
+        file_id = _probe_file_id(path)
+        cached = _get_cached_probe(file_id) if file_id is not None else None
+        if cached is not None:
+            results[path] = cached
+        else:
+            misses[path] = file_id
+
+    if not misses:
+        return results
+
+    if concurrency is None:
+        concurrency = min(os.cpu_count() or 1, 8)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe_one(path: str) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *_ffprobe_command(path),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                stdout, stderr = await process.communicate()
+            except OSError as e:
+                logger.error("Failed to probe file: %s: %s", path, e)
+                return None
+
+        if process.returncode != 0:
+            logger.error("Failed to probe file: %s: %s", path, stderr.decode('utf-8', 'replace').strip())
+            return None
+
+        try:
+            return _json_loads(stdout)
+        except ValueError as e:
+            logger.error("Failed to parse ffprobe output for %s: %s", path, e)
+            return None
+
+    logger.debug("Probing %d file(s), %d at a time", len(misses), concurrency)
+    probed = await asyncio.gather(*(probe_one(path) for path in misses))
+
+    for path, probe_data in zip(misses, probed):
+        results[path] = probe_data
+        if probe_data is not None and misses[path] is not None:
+            _put_cached_probe(misses[path], probe_data)
+
+    return results
+
+
+# The only ffprobe fields read from probe data; a field used elsewhere in
+# the code must be added here or it will be missing from probe results
+PROBE_ENTRIES = ':'.join([
+    'format=duration,start_time,format_name',
+    'stream=index,codec_type,codec_name,pix_fmt,channels',
+    'stream_tags=language,title',
+    'stream_disposition=default',
+])
+
+
+def _ffprobe_command(input_path: str) -> List[str]:
+    """
+    Build the ffprobe command used to probe a file
+
+    Args:
+        input_path: Path to input video file
+
+    Returns:
+        ffprobe command as list of arguments
+    """
+    return [
         'ffprobe',
         '-v', 'quiet',
         '-print_format', 'json',
-        '-show_format',
-        '-show_streams',
+        '-show_entries', PROBE_ENTRIES,
         input_path
     ]
 
+
+def _run_ffprobe(input_path: str, logger: logging.Logger) -> Dict:
+    """
+    Run ffprobe on a file and parse its JSON output
+
+    Args:
+        input_path: Path to input video file
+        logger: Logger instance
+
+    Returns:
+        Dictionary containing stream information
+
+    Raises:
+        RuntimeError: If ffprobe fails
+    """
+    logger.debug("Probing file: %s", input_path)
+
+    cmd = _ffprobe_command(input_path)
+
     try:
+        # Raw bytes: the JSON parser decodes them itself
         result = subprocess.run(
             cmd,
             capture_output=True,
-            text=True,
             check=True
         )
-        probe_data = json.loads(result.stdout)
-        logger.debug(f"Successfully probed file: {len(probe_data.get('streams', []))} streams found")
+        probe_data = _json_loads(result.stdout)
+        logger.debug("Successfully probed file: %d streams found", len(probe_data.get('streams', [])))
         return probe_data
     except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to probe file: {e.stderr}")
+        logger.error("Failed to probe file: %s", e.stderr.decode('utf-8', 'replace'))
         raise RuntimeError(f"Failed to probe file: {input_path}")
     except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse ffprobe output: {e}")
+        logger.error("Failed to parse ffprobe output: %s", e)
         raise RuntimeError(f"Invalid probe data for file: {input_path}")
 
 
-def get_streams_info(probe_data: Dict, logger: logging.Logger) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+# Probe results keyed by absolute path, each {'size', 'mtime_ns', 'entries', 'data'},
+# loaded lazily from disk and written back by save_probe_cache()
+_probe_cache: Optional[Dict[str, Dict]] = None
+
+# Paths probed by this process and not yet written to disk
+_probe_cache_dirty: Set[str] = set()
+
+# Cached paths whose file changed since, with its current (size, mtime_ns)
+_probe_cache_stale: Dict[str, Tuple[int, int]] = {}
+
+
+def _probe_file_id(input_path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Identify a file for the probe cache
+
+    Args:
+        input_path: Path to file
+
+    Returns:
+        (absolute path, size, mtime_ns), or None if the cache is disabled or
+        the file cannot be stat'ed
+    """
+    if not config.USE_PROBE_CACHE:
+        return None
+
+    try:
+        st = os.stat(input_path)
+    except OSError:
+        return None
+
+    return os.path.abspath(input_path), st.st_size, st.st_mtime_ns
+
+
+def _read_json_file(path: str) -> Dict:
+    """
+    Read a JSON cache file
+
+    Args:
+        path: Path to cache file
+
+    Returns:
+        Cached data (empty if the file is missing or unreadable)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return data if isinstance(data, dict) else {}
+
+
+def _write_json_file(path: str, data: Dict) -> None:
+    """
+    Atomically write a JSON cache file
+
+    Args:
+        path: Path to cache file
+        data: Data to write
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    cache_dir = os.path.dirname(path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_probe_cache_file() -> Dict[str, Dict]:
+    """
+    Read the persistent probe cache
+
+    Returns:
+        Cached entries keyed by absolute path (empty if the cache file is
+        missing or unreadable). Entries in another format, or probed for
+        other fields than PROBE_ENTRIES, are dropped.
+    """
+    return {
+        path: entry
+        for path, entry in _read_json_file(config.PROBE_CACHE_FILE).items()
+        if isinstance(entry, dict)
+        and {'size', 'mtime_ns', 'data'} <= entry.keys()
+        and entry.get('entries') == PROBE_ENTRIES
+    }
+
+
+def _load_probe_cache() -> Dict[str, Dict]:
+    """
+    Get the in-memory probe cache, loading it from disk on first use
+
+    Returns:
+        Probe cache dictionary
+    """
+    global _probe_cache
+    if _probe_cache is None:
+        _probe_cache = _read_probe_cache_file()
+    return _probe_cache
+
+
+def _get_cached_probe(file_id: Tuple[str, int, int]) -> Optional[Dict]:
+    """
+    Look up a probe result, ignoring it if the file changed since
+
+    Args:
+        file_id: Result of _probe_file_id()
+
+    Returns:
+        Cached probe data, or None on a miss
+    """
+    path, size, mtime_ns = file_id
+    entry = _load_probe_cache().get(path)
+    if entry is None:
+        return None
+    if entry['size'] != size or entry['mtime_ns'] != mtime_ns:
+        _probe_cache_stale[path] = (size, mtime_ns)
+        return None
+    return entry['data']
+
+
+def _put_cached_probe(file_id: Tuple[str, int, int], probe_data: Dict) -> None:
+    """
+    Add a probe result to the in-memory cache
+
+    Args:
+        file_id: Result of _probe_file_id()
+        probe_data: FFprobe output data
+    """
+    path, size, mtime_ns = file_id
+    _load_probe_cache()[path] = {'size': size, 'mtime_ns': mtime_ns, 'entries': PROBE_ENTRIES, 'data': probe_data}
+    _probe_cache_dirty.add(path)
+    _probe_cache_stale.pop(path, None)
+
+
+def save_probe_cache(logger: Optional[logging.Logger] = None) -> None:
+    """
+    Write new probe results to config.PROBE_CACHE_FILE
+
+    The cache file is re-read before writing so entries added by other
+    processes (e.g. parallel batch workers) are kept. Entries this process
+    found out of date (file changed since it was probed) are dropped; files
+    that cannot be reached, e.g. on an unmounted drive, keep their entries.
+
+    Args:
+        logger: Optional logger for write errors
+    """
+    if not _probe_cache_dirty and not _probe_cache_stale:
+        return
+
+    disk_cache = _read_probe_cache_file()
+    for path in _probe_cache_dirty:
+        disk_cache[path] = _probe_cache[path]
+
+    for path, (size, mtime_ns) in _probe_cache_stale.items():
+        entry = disk_cache.get(path)
+        # Another process may have stored the file's new probe meanwhile
+        if entry is not None and (entry['size'], entry['mtime_ns']) != (size, mtime_ns):
+            del disk_cache[path]
+
+    try:
+        _write_json_file(config.PROBE_CACHE_FILE, disk_cache)
+    except OSError as e:
+        if logger:
+            logger.debug("Could not write probe cache: %s", e)
+        return
+
+    _probe_cache_dirty.clear()
+    _probe_cache_stale.clear()
+
+
+# Results probed by this process are persisted when it exits
+atexit.register(save_probe_cache)
+
+
+@functools.lru_cache(maxsize=1)
+def get_ffmpeg_info() -> Optional[Dict]:
+    """
+    Locate FFmpeg and describe its version and encoders
+
+    The result is cached in config.FFMPEG_CACHE_FILE, keyed by the FFmpeg
+    binary's path and modification time, so ``ffmpeg -version`` and
+    ``ffmpeg -encoders`` only run again after FFmpeg is moved or upgraded.
+
+    Returns:
+        Dictionary with 'path', 'mtime_ns', 'version' and 'encoders',
+        or None if FFmpeg is not installed or not working
+    """
+    ffmpeg_path = shutil.which('ffmpeg')
+    if ffmpeg_path is None:
+        return None
+
+    try:
+        mtime_ns = os.stat(ffmpeg_path).st_mtime_ns
+    except OSError:
+        return None
+
+    # Entries missing a field (partial write, older format) are probed again
+    cached = _read_json_file(config.FFMPEG_CACHE_FILE)
+    if (
+        cached.get('path') == ffmpeg_path
+        and cached.get('mtime_ns') == mtime_ns
+        and isinstance(cached.get('version'), str)
+        and isinstance(cached.get('encoders'), list)
+        and cached['encoders']
+    ):
+        return cached
+
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, '-version'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+    version_lines = result.stdout.splitlines()
+    info = {
+        'path': ffmpeg_path,
+        'mtime_ns': mtime_ns,
+        'version': version_lines[0] if version_lines else '',
+        'encoders': sorted(_list_ffmpeg_encoders(ffmpeg_path)),
+    }
+
+    # A failed -encoders query would otherwise disable GPU detection until FFmpeg changes
+    if not info['encoders']:
+        return info
+
+    try:
+        _write_json_file(config.FFMPEG_CACHE_FILE, info)
+    except OSError:
+        pass
+
+    return info
+
+
+def _list_ffmpeg_encoders(ffmpeg_path: str) -> List[str]:
+    """
+    List encoders supported by an FFmpeg binary
+
+    Args:
+        ffmpeg_path: Path to the FFmpeg binary
+
+    Returns:
+        List of encoder names (empty if FFmpeg could not be queried)
+    """
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, '-hide_banner', '-encoders'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return []
+
+    encoders = []
+    for line in result.stdout.splitlines():
+        # Encoder lines look like: " V....D h264_nvenc  NVIDIA NVENC H.264 encoder"
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS' and parts[1] != '=':
+            encoders.append(parts[1])
+
+    return encoders
+
+
+def get_available_encoders() -> frozenset:
+    """
+    List encoders supported by the installed FFmpeg build
+
+    Returns:
+        Set of encoder names (empty if FFmpeg is not available)
+    """
+    info = get_ffmpeg_info()
+    return frozenset(info['encoders']) if info else frozenset()
+
+
+def select_hw_profile(logger: logging.Logger) -> Optional[str]:
+    """
+    Select the hardware encoder profile to use
+
+    Uses config.GPU_PROFILE when set, otherwise tries the profiles listed for
+    the current platform in config.HW_PROFILE_PRIORITY.
+
+    Args:
+        logger: Logger instance
+
+    Returns:
+        Key of config.HW_ENCODER_PROFILES, or None if no supported encoder is available
+    """
+    if config.GPU_PROFILE:
+        candidates = [config.GPU_PROFILE]
+    else:
+        candidates = next(
+            (names for prefix, names in config.HW_PROFILE_PRIORITY.items() if sys.platform.startswith(prefix)),
+            []
+        )
+
+    encoders = get_available_encoders()
+
+    for name in candidates:
+        profile = config.HW_ENCODER_PROFILES.get(name)
+        if profile is None:
+            logger.warning("Unknown GPU profile: %s", name)
+            continue
+
+        if profile['encoder'] in encoders:
+            logger.debug("Selected hardware profile: %s (%s)", name, profile['encoder'])
+            return name
+
+        logger.debug("Hardware encoder not available: %s", profile['encoder'])
+
+    return None
+
+
+@dataclass
+class StreamsInfo:
+    """Streams of a file grouped by type, with the French tracks located"""
+
+    video: List[Dict] = field(default_factory=list)
+    audio: List[Dict] = field(default_factory=list)
+    subtitle: List[Dict] = field(default_factory=list)
+    french_audio_idx: Optional[int] = None
+    french_subtitle_idx: Optional[int] = None
+
+
+def get_streams_info(probe_data: Dict, logger: logging.Logger) -> StreamsInfo:
     """
     Extract video, audio, and subtitle streams from probe data
 
+    French audio and subtitle tracks are detected in the same pass.
+
     Args:
         probe_data: FFprobe output data
         logger: Logger instance
 
     Returns:
-        Tuple of (video_streams, audio_streams, subtitle_streams)
+        StreamsInfo with the streams of each type and the French track indices
     """
     streams = probe_data.get('streams', [])
-
-    video_streams = []
-    audio_streams = []
-    subtitle_streams = []
+    info = StreamsInfo()
+    by_type = {'video': info.video, 'audio': info.audio, 'subtitle': info.subtitle}
 
     for stream in streams:
         codec_type = stream.get('codec_type', '')
-
-        if codec_type == 'video':
-            video_streams.append(stream)
-        elif codec_type == 'audio':
-            audio_streams.append(stream)
+        type_streams = by_type.get(codec_type)
+        if type_streams is None:
+            continue
+
+        if codec_type == 'audio':
+            if info.french_audio_idx is None:
+                match = _french_tag_match(stream)
+                if match:
+                    info.french_audio_idx = len(type_streams)
+                    logger.info("Found French audio stream at index %d (%s: %s)", info.french_audio_idx, *match)
         elif codec_type == 'subtitle':
-            subtitle_streams.append(stream)
+            if info.french_subtitle_idx is None:
+                match = _french_tag_match(stream)
+                if match:
+                    info.french_subtitle_idx = len(type_streams)
+                    logger.info("Found French subtitle stream at index %d (%s: %s)", info.french_subtitle_idx, *match)
 
-    logger.info(f"Found {len(video_streams)} video, {len(audio_streams)} audio, {len(subtitle_streams)} subtitle streams")
+        type_streams.append(stream)
 
-    return video_streams, audio_streams, subtitle_streams
+    logger.info(
+        "Found %d video, %d audio, %d subtitle streams",
+        len(info.video), len(info.audio), len(info.subtitle)
+    )
+
+    if info.subtitle and info.french_subtitle_idx is None:
+        logger.debug("No French subtitle stream found")
+
+    return info
 
 
-def find_french_audio_stream(audio_streams: List[Dict], logger: logging.Logger) -> Optional[int]:
+def get_stream_signature(probe_data: Dict) -> Tuple:
     """
-    Find French audio stream index
+    Summarize the stream properties that affect the FFmpeg command
 
     Args:
-        audio_streams: List of audio stream dictionaries
-        logger: Logger instance
+        probe_data: FFprobe output data
 
     Returns:
-        Index of French audio stream, or None if not found
+        Hashable tuple, equal for files with the same stream layout until
+        refresh() changes the French-first track order
     """
-    for idx, stream in enumerate(audio_streams):
-        tags = stream.get('tags', {})
-        language = tags.get('language', '').lower()
-        title = tags.get('title', '').lower()
+    return (_config_generation, tuple(
+        (
+            stream.get('codec_type'),
+            stream.get('codec_name'),
+            stream.get('pix_fmt'),
+            stream.get('channels'),
+            (stream.get('tags') or _EMPTY).get('language'),
+            (stream.get('tags') or _EMPTY).get('title'),
+        )
+        for stream in probe_data.get('streams', [])
+    ))
 
-        logger.debug(f"Audio stream {idx}: language='{language}', title='{title}'")
 
-        # Check if language matches any French language code
-        if any(fr_code in language for fr_code in config.FRENCH_LANGUAGE_CODES):
-            logger.info(f"Found French audio stream at index {idx} (language: {language})")
-            return idx
+def is_copyable_video(stream: Dict) -> bool:
+    """
+    Check if a video stream can be copied into the MP4 without re-encoding
 
-        # Also check title field for French indicators
-        if any(fr_code in title for fr_code in config.FRENCH_LANGUAGE_CODES):
-            logger.info(f"Found French audio stream at index {idx} (title: {title})")
-            return idx
+    Args:
+        stream: Video stream dictionary
 
-    logger.warning("No French audio stream found")
-    return None
+    Returns:
+        True if the stream is H.264 with a QuickTime-compatible pixel format
+    """
+    return stream.get('codec_name') == 'h264' and stream.get('pix_fmt') == config.PIXEL_FORMAT
 
 
-def find_french_subtitle_stream(subtitle_streams: List[Dict], logger: logging.Logger) -> Optional[int]:
+def is_copyable_audio(stream: Dict) -> bool:
     """
-    Find French subtitle stream index
+    Check if an audio stream can be copied into the MP4 without re-encoding
 
     Args:
-        subtitle_streams: List of subtitle stream dictionaries
-        logger: Logger instance
+        stream: Audio stream dictionary
 
     Returns:
-        Index of French subtitle stream, or None if not found
+        True if the stream is AAC with no more than the configured channel count
+    """
+    try:
+        channels = int(stream.get('channels', 0))
+    except (TypeError, ValueError):
+        return False
+
+    return stream.get('codec_name') == 'aac' and 0 < channels <= config.AUDIO_CHANNELS
+
+
+def _french_tag_match(stream: Dict) -> Optional[Tuple[str, str]]:
     """
-    for idx, stream in enumerate(subtitle_streams):
-        tags = stream.get('tags', {})
-        language = tags.get('language', '').lower()
-        title = tags.get('title', '').lower()
+    Check the language and title tags of a stream for a French language code
+
+    Args:
+        stream: Stream dictionary
 
-        logger.debug(f"Subtitle stream {idx}: language='{language}', title='{title}'")
+    Returns:
+        (tag name, lowercased value) of the matching tag, or None if not French
+    """
+    tags = stream.get('tags') or _EMPTY
+    language = tags.get('language', '').lower()
 
-        # Check if language matches any French language code
-        if any(fr_code in language for fr_code in config.FRENCH_LANGUAGE_CODES):
-            logger.info(f"Found French subtitle stream at index {idx} (language: {language})")
-            return idx
+    # Check if language is or contains a French language code; the tag is
+    # almost always an exact ISO code, so try a set lookup first
+    if language in _FRENCH_EXACT or _FRENCH_RE.search(language):
+        return 'language', language
 
-        # Also check title field
-        if any(fr_code in title for fr_code in config.FRENCH_LANGUAGE_CODES):
-            logger.info(f"Found French subtitle stream at index {idx} (title: {title})")
-            return idx
+    # Also check title field for French indicators, only read when needed
+    title = tags.get('title', '')
+    if title:
+        title = title.lower()
+        if _FRENCH_RE.search(title):
+            return 'title', title
 
-    logger.debug("No French subtitle stream found")
     return None
 
 
-def get_audio_mapping(audio_streams: List[Dict], logger: logging.Logger) -> List[int]:
+# Audio mappings keyed by the (language, title) layout of the audio streams,
+# so episodes of a series with identical tracks are only analysed once
+_audio_mapping_cache: Dict[Tuple[Tuple[str, str], ...], List[int]] = {}
+
+
+def get_audio_mapping(streams: StreamsInfo, logger: logging.Logger) -> List[int]:
     """
     Generate audio stream mapping with French audio first
 
     Args:
-        audio_streams: List of audio stream dictionaries
+        streams: Streams from get_streams_info()
         logger: Logger instance
 
     Returns:
         List of audio stream indices in desired order
     """
+    audio_streams = streams.audio
     if not audio_streams:
         logger.warning("No audio streams found")
         return []
 
-    french_idx = find_french_audio_stream(audio_streams, logger)
+    signature = tuple(
+        (tags.get('language', ''), tags.get('title', ''))
+        for tags in (stream.get('tags') or _EMPTY for stream in audio_streams)
+    )
+    cached = _audio_mapping_cache.get(signature)
+    if cached is not None:
+        logger.debug("Reusing audio mapping for identical stream layout: %s", cached)
+        return list(cached)
+
+    french_idx = streams.french_audio_idx
 
     if french_idx is None:
         # No French audio found, keep original order
+        logger.warning("No French audio stream found")
         logger.info("Using original audio stream order")
-        return list(range(len(audio_streams)))
+        mapping = list(range(len(audio_streams)))
+    else:
+        # Put French audio first, then others in their original order
+        mapping = [french_idx, *range(french_idx), *range(french_idx + 1, len(audio_streams))]
 
-    # Put French audio first, then others
-    mapping = [french_idx]
-    for idx in range(len(audio_streams)):
-        if idx != french_idx:
-            mapping.append(idx)
+        logger.info("Audio mapping order: %s (French audio at position 0)", mapping)
 
-    logger.info(f"Audio mapping order: {mapping} (French audio at position 0)")
-    return mapping
+    _audio_mapping_cache[signature] = mapping
+    return list(mapping)
 
 
 def validate_input_file(input_path: str, logger: logging.Logger) -> bool:
@@ -242,30 +885,38 @@ def validate_input_file(input_path: str, logger: logging.Logger) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not os.path.exists(input_path):
-        logger.error(f"Input file does not exist: {input_path}")
+    # One stat() answers both "exists" and "is a regular file"
+    try:
+        st = os.stat(input_path)
+    except OSError:
+        logger.error("Input file does not exist: %s", input_path)
         return False
 
-    if not os.path.isfile(input_path):
-        logger.error(f"Input path is not a file: {input_path}")
+    if not stat.S_ISREG(st.st_mode):
+        logger.error("Input path is not a file: %s", input_path)
         return False
 
-    file_ext = Path(input_path).suffix.lower()
-    if file_ext not in config.SUPPORTED_FORMATS:
-        logger.error(f"Unsupported file format: {file_ext}. Supported: {config.SUPPORTED_FORMATS}")
+    file_ext = os.path.splitext(input_path)[1].lower()
+    if file_ext not in _SUPPORTED_FORMATS:
+        logger.error("Unsupported file format: %s. Supported: %s", file_ext, config.SUPPORTED_FORMATS)
         return False
 
-    logger.debug(f"Input file validation passed: {input_path}")
+    logger.debug("Input file validation passed: %s", input_path)
     return True
 
 
-def generate_output_path(input_path: str, output_path: Optional[str] = None) -> str:
+def generate_output_path(
+    input_path: str,
+    output_path: Optional[str] = None,
+    output_dir: Optional[str] = None
+) -> str:
     """
     Generate output file path
 
     Args:
         input_path: Path to input file
         output_path: Optional custom output path
+        output_dir: Output directory (uses config default if None)
 
     Returns:
         Output file path
@@ -273,11 +924,46 @@ def generate_output_path(input_path: str, output_path: Optional[str] = None) ->
     if output_path:
         return output_path
 
-    input_file = Path(input_path)
-    output_name = f"{input_file.stem}{config.OUTPUT_SUFFIX}.mp4"
+    if output_dir is None:
+        output_dir = config.OUTPUT_DIR
+
+    _ensure_dir(output_dir)
+    return _output_path_for(input_path, output_dir)
 
-    os.makedirs(config.OUTPUT_DIR, exist_ok=True)
-    return os.path.join(config.OUTPUT_DIR, output_name)
+
+# Directories already created by _ensure_dir()
+_ensured_dirs: Set[str] = set()
+
+
+def _ensure_dir(directory: str) -> None:
+    """
+    Create a directory once per process
+
+    Args:
+        directory: Directory path
+    """
+    if directory not in _ensured_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
+
+
+@functools.lru_cache(maxsize=1024)
+def _output_path_for(input_path: str, output_dir: str) -> str:
+    """
+    Build the converted file path for an input file
+
+    Args:
+        input_path: Path to input file
+        output_dir: Output directory
+
+    Returns:
+        Output file path
+    """
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{stem}{config.OUTPUT_SUFFIX}.mp4")
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -290,11 +976,9 @@ def format_file_size(size_bytes: int) -> str:
     Returns:
         Formatted file size string
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} TB"
+    # Units are powers of 1024, so the bit length gives the unit directly
+    unit_idx = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit_idx * 10)):.2f} {_SIZE_UNITS[unit_idx]}"
 
 
 def get_file_size(file_path: str) -> int:
@@ -320,12 +1004,56 @@ def format_duration(seconds: float) -> str:
     Returns:
         Formatted duration string
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
+def get_keyframe_times(input_path: str, logger: logging.Logger) -> List[float]:
+    """
+    List keyframe timestamps of the first video stream
+
+    Reads packet flags only, so no frame is decoded.
+
+    Args:
+        input_path: Path to input video file
+        logger: Logger instance
+
+    Returns:
+        Sorted keyframe timestamps in seconds (empty if ffprobe fails)
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        input_path
+    ]
+
+    try:
+        # One line per packet: parse the bytes, float() accepts them directly
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        logger.warning("Failed to list keyframes: %s", e.stderr.decode('utf-8', 'replace'))
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(b',')
+        if flags.startswith(b'K'):
+            try:
+                keyframes.append(float(pts_time))
+            except ValueError:
+                continue
+
+    return sorted(keyframes)
+
+
 def get_video_duration(probe_data: Dict) -> Optional[float]:
     """
     Extract video duration from probe data
@@ -345,6 +1073,22 @@ def get_video_duration(probe_data: Dict) -> Optional[float]:
     return None
 
 
+def get_start_time(probe_data: Dict) -> float:
+    """
+    Extract the container start time from probe data
+
+    Args:
+        probe_data: FFprobe output data
+
+    Returns:
+        Start time in seconds (0.0 if not found)
+    """
+    try:
+        return float(probe_data.get('format', {}).get('start_time', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def list_files_in_directory(directory: str, extensions: Optional[List[str]] = None) -> List[str]:
     """
     List files in directory with optional extension filter
@@ -359,36 +1103,54 @@ def list_files_in_directory(directory: str, extensions: Optional[List[str]] = No
     if not os.path.exists(directory):
         return []
 
-    if extensions is None:
-        extensions = config.SUPPORTED_FORMATS
+    extensions = _SUPPORTED_FORMATS if extensions is None else frozenset(extensions)
 
-    files = []
-    for file_name in os.listdir(directory):
-        file_path = os.path.join(directory, file_name)
-        if os.path.isfile(file_path):
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext in extensions:
-                files.append(file_path)
+    # DirEntry.is_file() reuses the file type from the directory read, no stat() per entry
+    with os.scandir(directory) as entries:
+        files = [
+            entry.path for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions
+        ]
 
     return sorted(files)
 
 
-def is_already_converted(input_path: str, output_dir: str = None) -> bool:
+def is_converted_output(file_path: str) -> bool:
     """
-    Check if file has already been converted
+    Check if a file is named like an output of this converter
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        True if the name is <stem>OUTPUT_SUFFIX.mp4, False otherwise
+    """
+    if not config.OUTPUT_SUFFIX:
+        return False
+
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    return ext.lower() == '.mp4' and stem.endswith(config.OUTPUT_SUFFIX)
+
+
+def list_converted_files(output_dir: Optional[str] = None) -> Set[str]:
+    """
+    List the names of the converted files in the output directory
+
+    One directory scan, so a batch can check every input against the set
+    instead of testing each output path.
 
     Args:
-        input_path: Path to input file
         output_dir: Output directory (uses config default if None)
 
     Returns:
-        True if converted file exists, False otherwise
+        Set of MP4 file names (empty if the directory does not exist)
     """
     if output_dir is None:
         output_dir = config.OUTPUT_DIR
 
-    input_file = Path(input_path)
-    output_name = f"{input_file.stem}{config.OUTPUT_SUFFIX}.mp4"
-    output_path = os.path.join(output_dir, output_name)
+    try:
+        with os.scandir(output_dir) as entries:
+            return {entry.name for entry in entries if entry.name.endswith('.mp4') and entry.is_file()}
+    except FileNotFoundError:
+        return set()
 
-    return os.path.exists(output_path)